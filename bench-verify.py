@@ -0,0 +1,246 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from verifier_loader import load_verifier
+
+verifier = load_verifier()
+
+class MockExplorer:
+    # Локальная замена API эксплорера: verifysourcecode ставит задачу в очередь с задержкой
+    # queue_delay (±50%), checkverifystatus отвечает Pending, пока задача не готова.
+    # error_rate - доля ответов 502, rate_limit - вызовов в секунду на один API-ключ,
+    # slow_rate - доля ответов, задержанных на slow_delay секунд (хвост задержек).
+    def __init__(self, queue_delay=3.0, error_rate=0.0, rate_limit=5.0, slow_rate=0.0, slow_delay=5.0):
+        self.queue_delay = queue_delay
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.jobs = {}
+        self.verified = set()
+        self.buckets = {}
+        self.counts = {"verifysourcecode": 0, "checkverifystatus": 0, "throttled": 0, "errors": 0}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _allow(self, key):
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (self.rate_limit, now))
+        tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+        if tokens < 1:
+            self.buckets[key] = (tokens, now)
+            return False
+        self.buckets[key] = (tokens - 1, now)
+        return True
+
+    def handle(self, params):
+        action = params.get("action")
+        if random.random() < self.slow_rate:
+            time.sleep(self.slow_delay)
+        with self.lock:
+            self.counts[action] = self.counts.get(action, 0) + 1
+            if random.random() < self.error_rate:
+                self.counts["errors"] += 1
+                return 502, None
+            if not self._allow(params.get("apikey", "")):
+                self.counts["throttled"] += 1
+                return 200, {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+            now = time.monotonic()
+            if action == "verifysourcecode":
+                address = params.get("contractaddress", "").lower()
+                if address in self.verified:
+                    return 200, {"status": "0", "message": "NOTOK", "result": "Contract source code already verified"}
+                guid = uuid.uuid4().hex
+                self.jobs[guid] = (address, now + self.queue_delay * random.uniform(0.5, 1.5))
+                return 200, {"status": "1", "message": "OK", "result": guid}
+
+            if action == "checkverifystatus":
+                job = self.jobs.get(params.get("guid"))
+                if job is None:
+                    return 200, {"status": "0", "message": "NOTOK", "result": "Unknown UID"}
+                address, ready_at = job
+                if now < ready_at:
+                    return 200, {"status": "0", "message": "NOTOK", "result": "Pending in queue"}
+                self.verified.add(address)
+                return 200, {"status": "1", "message": "OK", "result": "Pass - Verified"}
+
+            if action == "getsourcecode":
+                if params.get("address", "").lower() in self.verified:
+                    entry = {"SourceCode": "contract Token {}", "ABI": "[]", "ContractName": "Token",
+                             "CompilerVersion": "v0.8.19+commit.7dd6d404"}
+                else:
+                    entry = {"SourceCode": "", "ABI": "Contract source code not verified", "ContractName": "",
+                             "CompilerVersion": ""}
+                return 200, {"status": "1", "message": "OK", "result": [entry]}
+
+            return 200, {"status": "0", "message": "NOTOK", "result": f"Unknown action {action}"}
+
+    def start(self):
+        explorer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, params):
+                code, body = explorer.handle({k: v[0] for k, v in params.items()})
+                payload = json.dumps(body).encode() if body is not None else b"<html>Bad Gateway</html>"
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json" if body is not None else "text/html")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._respond(parse_qs(self.rfile.read(length).decode()))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}/api"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request_count(self):
+        with self.lock:
+            return self.counts.get("verifysourcecode", 0) + self.counts.get("checkverifystatus", 0)
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def make_deployments(count):
+    return [{"address": "0x%040x" % random.getrandbits(160)} for _ in range(count)]
+
+def summarize(name, explorer, requests_before, started, results):
+    wall = time.monotonic() - started
+    done = [r for r in results if r["status"] in (verifier.STATUS_VERIFIED, verifier.STATUS_ALREADY_VERIFIED)]
+    times = [r["elapsed"] for r in done if r.get("elapsed") is not None]
+    requests_sent = explorer.request_count() - requests_before
+    return {
+        "mode": name,
+        "jobs": len(results),
+        "verified": len(done),
+        "wall": round(wall, 3),
+        "jobs_per_minute": round(len(done) / wall * 60, 2) if wall else None,
+        "p50": percentile(times, 50),
+        "p95": percentile(times, 95),
+        "p99": percentile(times, 99),
+        "requests_per_verified": round(requests_sent / len(done), 2) if done else None,
+    }
+
+def run_legacy(explorer, jobs):
+    requests_before = explorer.request_count()
+    started = time.monotonic()
+    results = []
+    for deployment in make_deployments(jobs):
+        job_started = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            final = verifier.verify_contract(deployment["address"], "")
+        status = final["status"] if final else verifier.STATUS_FAILED
+        results.append({"status": status, "elapsed": time.monotonic() - job_started})
+    return summarize("legacy", explorer, requests_before, started, results)
+
+def run_batch(explorer, jobs, concurrency):
+    requests_before = explorer.request_count()
+    started = time.monotonic()
+    results = list(verifier.iter_verify_batch(make_deployments(jobs), concurrency))
+    return summarize("batch", explorer, requests_before, started, results)
+
+def check_regressions(report, baseline, tolerance):
+    failures = []
+    for current in report:
+        previous = next((b for b in baseline if b["mode"] == current["mode"]), None)
+        if previous is None:
+            continue
+        if previous["jobs_per_minute"] and current["jobs_per_minute"] is not None and \
+                current["jobs_per_minute"] < previous["jobs_per_minute"] * (1 - tolerance):
+            failures.append(f"{current['mode']}: jobs/min {current['jobs_per_minute']} < {previous['jobs_per_minute']}")
+        for key in ("p95", "p99", "requests_per_verified"):
+            if previous.get(key) and current.get(key) is not None and current[key] > previous[key] * (1 + tolerance):
+                failures.append(f"{current['mode']}: {key} {current[key]:.2f} > {previous[key]:.2f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the verification flow against a local mock explorer")
+    parser.add_argument("--jobs", type=int, default=50, help="deployments for the batch run")
+    parser.add_argument("--legacy-jobs", type=int, default=3, help="deployments for verify_contract(), 0 to skip")
+    parser.add_argument("--concurrency", type=int, default=verifier.DEFAULT_CONCURRENCY)
+    parser.add_argument("--queue-delay", type=float, default=3.0, help="mean explorer queue time, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 502")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of responses delayed by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="delay of slow responses, seconds")
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="calls per second per API key, 0 for none")
+    parser.add_argument("--keys", type=int, default=1, help="API keys the client spreads calls over")
+    parser.add_argument("--client-rate", type=float,
+                        help="client-side calls per second per key, defaults to --rate-limit")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="previous --output report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    explorer = MockExplorer(args.queue_delay, args.error_rate, args.rate_limit, args.slow_rate, args.slow_delay)
+    url = explorer.start()
+    keys = [f"bench-{i}" for i in range(args.keys)]
+    client_rate = args.rate_limit if args.client_rate is None else args.client_rate
+    verifier.set_explorer_client(verifier.ExplorerClient(url=url, api_keys=keys, rate_limit=client_rate or 1000.0))
+
+    report = []
+    try:
+        if args.legacy_jobs:
+            report.append(run_legacy(explorer, args.legacy_jobs))
+        report.append(run_batch(explorer, args.jobs, args.concurrency))
+    finally:
+        explorer.stop()
+
+    print(f"{'mode':<8} {'jobs':>5} {'ok':>5} {'wall,s':>8} {'jobs/min':>9} "
+          f"{'p50,s':>7} {'p95,s':>7} {'p99,s':>7} {'req/ok':>7}")
+    for row in report:
+        cells = [row[k] if row[k] is not None else float("nan") for k in
+                 ("wall", "jobs_per_minute", "p50", "p95", "p99", "requests_per_verified")]
+        print(f"{row['mode']:<8} {row['jobs']:>5} {row['verified']:>5} {cells[0]:>8.2f} {cells[1]:>9.1f} "
+              f"{cells[2]:>7.2f} {cells[3]:>7.2f} {cells[4]:>7.2f} {cells[5]:>7.2f}")
+    print("Mock explorer calls:", json.dumps(explorer.counts))
+    print("Client keys:", json.dumps(verifier.get_explorer_client().keys.stats()))
+    print("Client resilience:", json.dumps(verifier.get_explorer_client().resilience_stats()))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(report, json.load(f), args.tolerance)
+        for failure in failures:
+            print("Regression:", failure)
+        if failures:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import json
+import sys
+import time
+
+from verifier_loader import load_verifier
+
+verifier = load_verifier()
+
+# updateWhitelist(address,bool)
+UPDATE_WHITELIST = "0x0d392cd9"
+# updateWhitelistBatch(address[],bool[])
+UPDATE_WHITELIST_BATCH = "0xf0322bd8"
+# transfer(address,uint256)
+TRANSFER = "0xa9059cbb"
+# excludeFromTax(address,bool)
+EXCLUDE_FROM_TAX = "0xc6a30647"
+# setUniswapV3Pool(address)
+SET_UNISWAP_V3_POOL = "0xe8b68242"
+# approve(address,uint256)
+APPROVE = "0x095ea7b3"
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_SIZES = "1,10,50,100,200"
+DEFAULT_BATCH_SIZES = "1,10,50"
+# Настройки компилятора из hardhat.config.js
+SOLC_VERSION = "0.8.19"
+OPTIMIZER_RUNS = 200
+VIA_IR = True
+TX_GAS = 25_000_000
+FILL_CHUNK = 100
+SUPPLY = 10 ** 27
+
+def calldata(selector, types, values):
+    return selector + verifier.get_abi_encoder(tuple(types)).encode(values)
+
+def filler(i):
+    # Детерминированные адреса для наполнения whitelist
+    return "0x%040x" % (0x10000 + i)
+
+class Chain:
+    # Локальная нода Hardhat: аккаунты разблокированы, автомайнинг, evm_snapshot/evm_revert
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.accounts = rpc.call("eth_accounts")
+
+    def send(self, sender, to, data):
+        started = time.perf_counter()
+        tx = {"from": sender, "data": data, "gas": hex(TX_GAS)}
+        if to:
+            tx["to"] = to
+        tx_hash = self.rpc.call("eth_sendTransaction", tx)
+        receipt = self.rpc.call("eth_getTransactionReceipt", tx_hash)
+        elapsed = time.perf_counter() - started
+        if receipt is None or int(receipt["status"], 16) != 1:
+            raise RuntimeError(f"Transaction {tx_hash} failed")
+        return receipt, elapsed
+
+    def snapshot(self):
+        return self.rpc.call("evm_snapshot")
+
+    def revert(self, snapshot_id):
+        if not self.rpc.call("evm_revert", snapshot_id):
+            raise RuntimeError(f"evm_revert({snapshot_id}) failed")
+
+class TokenBench:
+    def __init__(self, chain, bytecode):
+        self.chain = chain
+        self.owner, self.pool, self.wallet, self.excluded = chain.accounts[:4]
+        args = verifier.encode_constructor_arguments(
+            ["Bench", "BNCH", SUPPLY // 2, [], 5, 5, 5, "", "", "", False, True, SUPPLY, self.owner],
+            verifier.FLATTENED_TOKEN_CONSTRUCTOR_TYPES,
+        )
+        receipt, _ = chain.send(self.owner, None, "0x" + bytecode.removeprefix("0x") + args)
+        self.token = receipt["contractAddress"]
+        self.size = 1
+
+        # Пул - обычный аккаунт ноды: перевод на него - sell, с него - buy
+        self.call(SET_UNISWAP_V3_POOL, ("address",), [self.pool])
+        self.call(TRANSFER, ("address", "uint256"), [self.pool, SUPPLY // 10])
+        self.call(EXCLUDE_FROM_TAX, ("address", "bool"), [self.excluded, True])
+
+    def call(self, selector, types, values, sender=None):
+        return self.chain.send(sender or self.owner, self.token, calldata(selector, types, values))
+
+    def grow_whitelist(self, size):
+        while self.size < size:
+            count = min(FILL_CHUNK, size - self.size)
+            accounts = [filler(self.size + i) for i in range(count)]
+            self.call(UPDATE_WHITELIST_BATCH, ("address[]", "bool[]"), [accounts, [True] * count])
+            self.size += count
+
+    def measure(self, selector, types, values, sender=None):
+        # Каждая операция меряется на одном и том же состоянии и откатывается
+        snapshot_id = self.chain.snapshot()
+        try:
+            receipt, elapsed = self.call(selector, types, values, sender)
+        finally:
+            self.chain.revert(snapshot_id)
+        return int(receipt["gasUsed"], 16), elapsed
+
+    def operations(self, batch_sizes):
+        last = [filler(i) for i in range(1, self.size)]
+        amount = 10 ** 18
+        yield "updateWhitelist.add", None, (UPDATE_WHITELIST, ("address", "bool"), [filler(10 ** 6), True])
+        if last:
+            # Удаление последнего добавленного - худший случай: линейный поиск до конца массива
+            yield "updateWhitelist.remove", None, (UPDATE_WHITELIST, ("address", "bool"), [last[-1], False])
+        for batch in batch_sizes:
+            new = [filler(10 ** 6 + i) for i in range(batch)]
+            yield "updateWhitelistBatch.add", batch, (UPDATE_WHITELIST_BATCH, ("address[]", "bool[]"),
+                                                      [new, [True] * batch])
+            if batch <= len(last):
+                yield "updateWhitelistBatch.remove", batch, (UPDATE_WHITELIST_BATCH, ("address[]", "bool[]"),
+                                                             [last[-batch:][::-1], [False] * batch])
+        yield "transfer.wallet", None, (TRANSFER, ("address", "uint256"), [self.wallet, amount])
+        yield "transfer.sell", None, (TRANSFER, ("address", "uint256"), [self.pool, amount])
+        yield "transfer.buy", None, (TRANSFER, ("address", "uint256"), [self.wallet, amount], self.pool)
+        yield "transfer.excluded", None, (TRANSFER, ("address", "uint256"), [self.excluded, amount])
+        yield "excludeFromTax", None, (EXCLUDE_FROM_TAX, ("address", "bool"), [self.wallet, True])
+        yield "setUniswapV3Pool", None, (SET_UNISWAP_V3_POOL, ("address",), [self.wallet])
+        yield "approve", None, (APPROVE, ("address", "uint256"), [self.wallet, amount])
+
+def run(chain, bytecode, sizes, batch_sizes):
+    bench = TokenBench(chain, bytecode)
+    rows = []
+    for size in sorted(sizes):
+        bench.grow_whitelist(size)
+        for name, batch, operation in bench.operations(batch_sizes):
+            gas, elapsed = bench.measure(*operation)
+            rows.append({"function": name, "whitelist": bench.size, "batch": batch, "gas": gas,
+                         "ms": round(elapsed * 1000, 3)})
+    return rows
+
+def slopes(rows):
+    # Прирост газа на один элемент whitelist между крайними размерами - наклон кривой
+    curves = {}
+    for row in rows:
+        curves.setdefault((row["function"], row["batch"]), []).append((row["whitelist"], row["gas"]))
+    result = {}
+    for key, points in curves.items():
+        (x0, y0), (x1, y1) = points[0], points[-1]
+        result[key] = (y1 - y0) / (x1 - x0) if x1 != x0 else 0.0
+    return result
+
+def check_regressions(rows, baseline, tolerance):
+    previous = {(b["function"], b["whitelist"], b["batch"]): b for b in baseline}
+    failures = []
+    for row in rows:
+        old = previous.get((row["function"], row["whitelist"], row["batch"]))
+        if old and row["gas"] > old["gas"] * (1 + tolerance):
+            batch = f" batch {row['batch']}" if row["batch"] else ""
+            failures.append(f"{row['function']} at whitelist {row['whitelist']}{batch}: "
+                            f"gas {row['gas']} > {old['gas']}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas and wall-time scaling of Token hot paths on a local Hardhat node")
+    parser.add_argument("--rpc-url", default=DEFAULT_RPC_URL, help="`npx hardhat node` endpoint")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="whitelist sizes to measure at")
+    parser.add_argument("--batch-sizes", default=DEFAULT_BATCH_SIZES, help="updateWhitelistBatch sizes")
+    parser.add_argument("--solc", default=SOLC_VERSION)
+    parser.add_argument("--runs", type=int, default=OPTIMIZER_RUNS)
+    parser.add_argument("--no-via-ir", action="store_true")
+    parser.add_argument("--output", help="write the measurements as JSON")
+    parser.add_argument("--baseline", help="previous --output to compare gas against")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="allowed relative gas increase")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    contract = verifier.compile_contract(verifier.get_flattened_contract(), "Token", args.solc, args.runs,
+                                         not args.no_via_ir)
+    print(f"Compiled Token with solc {args.solc} in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+    chain = Chain(verifier.RpcClient(args.rpc_url))
+    sizes = [int(size) for size in args.sizes.split(",")]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    rows = run(chain, contract["bytecode"], sizes, batch_sizes)
+
+    print(f"{'function':<28} {'batch':>5} " + " ".join(f"{'wl=' + str(row['whitelist']):>10}"
+                                                    for row in rows if row["function"] == "transfer.wallet"))
+    curves = {}
+    for row in rows:
+        curves.setdefault((row["function"], row["batch"]), []).append(row)
+    for (name, batch), points in curves.items():
+        print(f"{name:<28} {batch or '':>5} " + " ".join(f"{point['gas']:>10}" for point in points))
+    print("\nGas per whitelist entry:")
+    for (name, batch), slope in slopes(rows).items():
+        if slope:
+            print(f"  {name}{f' x{batch}' if batch else ''}: {slope:.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(rows, json.load(f), args.tolerance)
+        for failure in failures:
+            print("Regression:", failure)
+        if failures:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
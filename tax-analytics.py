@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from verifier_loader import load_verifier
+
+verifier = load_verifier()
+
+# keccak256("TaxCollected(address,address,uint256,string)")
+TAX_COLLECTED_TOPIC = "0x7f0ccdd564a158c13b57fbe3b8609b29479b1a8c7a942fd3681a902806766b55"
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+STORE_DIR = verifier.CACHE_DIR / "tax-events"
+TOKENS_PER_QUERY = 200
+
+KIND_TRANSFER = 0
+KIND_BUY = 1
+KIND_SELL = 2
+KIND_WALLET = 3
+KIND_NAMES = {KIND_TRANSFER: "transfer", KIND_BUY: "buy", KIND_SELL: "sell", KIND_WALLET: "wallet"}
+TAX_KINDS = {"buy": KIND_BUY, "sell": KIND_SELL, "wallet": KIND_WALLET}
+
+BUCKETS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+# Колонка: (dtype, форма строки). uint256 хранится как 8 limb по 32 бита, младший первым:
+# сумма по группе считается в uint64 на каждый limb без переполнения до 2**32 строк.
+COLUMNS = {
+    "token": ("<u4", ()),
+    "block": ("<u8", ()),
+    "logIndex": ("<u4", ()),
+    "time": ("<u8", ()),
+    "kind": ("u1", ()),
+    "amount": ("<u4", (8,)),
+}
+
+class ColumnStore:
+    # Каталог с одним бинарным файлом на колонку и meta.json. Строки только дописываются в конец;
+    # meta.json с числом строк пишется последним, поэтому хвост от прерванной записи
+    # отбрасывается при следующем открытии.
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.path / "meta.json") as f:
+                self.meta = json.load(f)
+        except FileNotFoundError:
+            self.meta = {"rows": 0, "tokens": {}}
+        for name in COLUMNS:
+            path = self._file(name)
+            if path.exists() and path.stat().st_size > self._size(name, self.rows):
+                with open(path, "r+b") as f:
+                    f.truncate(self._size(name, self.rows))
+
+    @property
+    def rows(self):
+        return self.meta["rows"]
+
+    def _file(self, name):
+        return self.path / f"{name}.bin"
+
+    def _size(self, name, rows):
+        dtype, shape = COLUMNS[name]
+        return rows * np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+
+    def _save_meta(self):
+        tmp = self.path / "meta.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.path / "meta.json")
+
+    def token_id(self, address, from_block=0):
+        address = address.lower()
+        token = self.meta["tokens"].get(address)
+        if token is None:
+            token = {"id": len(self.meta["tokens"]), "lastBlock": from_block - 1}
+            self.meta["tokens"][address] = token
+        return token["id"]
+
+    def token_addresses(self):
+        addresses = [None] * len(self.meta["tokens"])
+        for address, token in self.meta["tokens"].items():
+            addresses[token["id"]] = address
+        return addresses
+
+    def append(self, columns, tokens, last_block):
+        rows = len(columns["block"])
+        if rows:
+            for name, (dtype, shape) in COLUMNS.items():
+                data = np.ascontiguousarray(columns[name], dtype=dtype)
+                if data.shape != (rows,) + shape:
+                    raise ValueError(f"Column {name} has shape {data.shape}, expected {(rows,) + shape}")
+                with open(self._file(name), "ab") as f:
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+        self.meta["rows"] += rows
+        for address in tokens:
+            self.meta["tokens"][address.lower()]["lastBlock"] = last_block
+        self._save_meta()
+
+    def column(self, name):
+        dtype, shape = COLUMNS[name]
+        if not self.rows:
+            return np.empty((0,) + shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=(self.rows,) + shape)
+
+def decode_logs(rpc, store, logs):
+    # Логи куска -> колонки; время блока берётся одним JSON-RPC batch на уникальные блоки
+    logs = [log for log in logs if not log.get("removed")]
+    timestamps = verifier.block_timestamps(rpc, [int(log["blockNumber"], 16) for log in logs])
+    tax_decoder = verifier.get_abi_decoder(("uint256", "string"))
+    count = len(logs)
+    token = np.empty(count, dtype="<u4")
+    block = np.empty(count, dtype="<u8")
+    log_index = np.empty(count, dtype="<u4")
+    block_time = np.empty(count, dtype="<u8")
+    kind = np.empty(count, dtype="u1")
+    amounts = bytearray()
+    for i, log in enumerate(logs):
+        token[i] = store.token_id(log["address"])
+        block[i] = int(log["blockNumber"], 16)
+        log_index[i] = int(log["logIndex"], 16)
+        block_time[i] = timestamps[int(block[i])]
+        data = bytes.fromhex(log["data"][2:])
+        if log["topics"][0] == TAX_COLLECTED_TOPIC:
+            kind[i] = TAX_KINDS.get(tax_decoder.decode(data)[1], KIND_WALLET)
+        else:
+            kind[i] = KIND_TRANSFER
+        amounts += data[:32]
+    # 32 байта big-endian -> 8 limb uint32, младший первым
+    amount = np.frombuffer(bytes(amounts), dtype=">u4").reshape(count, 8)[:, ::-1].astype("<u4")
+    return {"token": token, "block": block, "logIndex": log_index, "time": block_time, "kind": kind,
+            "amount": amount}
+
+def ingest(rpc, store, tokens, from_block=0, confirmations=0, tokens_per_query=TOKENS_PER_QUERY):
+    head = rpc.block_number() - confirmations
+    for address in tokens:
+        store.token_id(address, from_block)
+
+    # Токены, добавленные позже, догоняются отдельно от уже просканированных
+    groups = {}
+    for address, token in store.meta["tokens"].items():
+        groups.setdefault(token["lastBlock"] + 1, []).append(address)
+
+    added = 0
+    for start, addresses in sorted(groups.items()):
+        for i in range(0, len(addresses), tokens_per_query):
+            part = addresses[i:i + tokens_per_query]
+            for logs, to_block, _ in verifier.iter_log_chunks(rpc, part, [[TAX_COLLECTED_TOPIC, TRANSFER_TOPIC]],
+                                                              start, head):
+                columns = decode_logs(rpc, store, logs)
+                store.append(columns, part, to_block)
+                added += len(columns["block"])
+    return added
+
+def aggregate(store, bucket_seconds, kinds, token=None, since=None):
+    # Группировка по (token, kind, bucket): сортировка ключей и np.add.reduceat по limb в uint64,
+    # перенос разрядов - только по итоговым группам
+    tokens = store.column("token")
+    kind = store.column("kind")
+    block_time = store.column("time")
+    mask = np.isin(kind, np.array(kinds, dtype="u1"))
+    if token is not None:
+        mask &= tokens == store.meta["tokens"][token.lower()]["id"]
+    if since is not None:
+        mask &= block_time >= since
+    rows = np.flatnonzero(mask)
+    if not rows.size:
+        return []
+
+    bucket = block_time[rows] // bucket_seconds
+    keys = (tokens[rows].astype(np.uint64) << np.uint64(40)) | (kind[rows].astype(np.uint64) << np.uint64(32)) | bucket
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    limbs = np.add.reduceat(store.column("amount")[rows[order]].astype(np.uint64), starts, axis=0)
+    counts = np.diff(np.concatenate((starts, [keys.size])))
+
+    addresses = store.token_addresses()
+    result = []
+    for key, count, sums in zip(keys[starts].tolist(), counts.tolist(), limbs.tolist()):
+        total = sum(limb << (32 * i) for i, limb in enumerate(sums))
+        result.append({
+            "token": addresses[key >> 40],
+            "kind": KIND_NAMES[(key >> 32) & 0xff],
+            "bucket": (key & 0xffffffff) * bucket_seconds,
+            "count": count,
+            "total": total,
+        })
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar TaxCollected/Transfer storage and aggregation")
+    parser.add_argument("--store", default=str(STORE_DIR), help="column store directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = subparsers.add_parser("ingest", help="append new logs of the given tokens")
+    ingest_cmd.add_argument("tokens", nargs="?", help="JSON list or JSONL of token addresses; "
+                                                      "already stored tokens are always updated")
+    ingest_cmd.add_argument("--rpc-url", default=verifier.env_setting("REACT_APP_RPC_URL"))
+    ingest_cmd.add_argument("--from-block", type=int, default=0, help="first block for new tokens")
+    ingest_cmd.add_argument("--confirmations", type=int, default=0)
+    ingest_cmd.add_argument("--tokens-per-query", type=int, default=TOKENS_PER_QUERY)
+
+    aggregate_cmd = subparsers.add_parser("aggregate", help="totals by token, tax type and time bucket")
+    aggregate_cmd.add_argument("--bucket", default="day", help="hour, day, week or seconds")
+    aggregate_cmd.add_argument("--kind", choices=("tax", "buy", "sell", "wallet", "transfer"), default="tax")
+    aggregate_cmd.add_argument("--token", help="only this token")
+    aggregate_cmd.add_argument("--since", type=int, help="unix time of the first event to count")
+    aggregate_cmd.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args()
+
+    store = ColumnStore(args.store)
+    started = time.monotonic()
+    if args.command == "ingest":
+        if not args.rpc_url:
+            parser.error("--rpc-url is required")
+        tokens = [row["address"] for row in verifier.load_rows(args.tokens)] if args.tokens else []
+        added = ingest(verifier.RpcClient(args.rpc_url), store, tokens, args.from_block, args.confirmations,
+                       args.tokens_per_query)
+        print(f"Appended {added} events, {store.rows} total, in {time.monotonic() - started:.1f}s")
+        return
+
+    bucket_seconds = BUCKETS.get(args.bucket) or int(args.bucket)
+    kinds = {"tax": (KIND_BUY, KIND_SELL, KIND_WALLET), "transfer": (KIND_TRANSFER,)}.get(
+        args.kind, (TAX_KINDS.get(args.kind),))
+    rows = aggregate(store, bucket_seconds, kinds, args.token, args.since)
+    for row in rows:
+        if args.json:
+            print(json.dumps(dict(row, total=str(row["total"]))))
+        else:
+            bucket = datetime.fromtimestamp(row["bucket"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+            print(f"{row['token']}  {row['kind']:<8} {bucket}  {row['count']:>8}  {row['total']}")
+    print(f"{len(rows)} groups over {store.rows} events in {time.monotonic() - started:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from verifier_loader import load_verifier
+
+verifier = load_verifier()
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# aggregate3((address,bool,bytes)[])
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_WORKERS = 4
+
+# Геттеры Token из get_flattened_contract(): имя, селектор, типы результата, колонки таблицы
+GETTERS = (
+    # getTokenNumbers()
+    ("getTokenNumbers", "95318fd0", ("uint256",) * 5,
+     ("maxSupply", "totalSupply", "buyTax", "sellTax", "walletTax")),
+    # getTokenBasicInfo()
+    ("getTokenBasicInfo", "e175cf47", ("string", "string", "string", "bool", "bool"),
+     ("logoUrl", "website", "telegram", "salesLocked", "mintable")),
+    # owner()
+    ("owner", "8da5cb5b", ("address",), ("owner",)),
+    # paused()
+    ("paused", "5c975abb", ("bool",), ("paused",)),
+    # uniswapV2Pair()
+    ("uniswapV2Pair", "49bd5a5e", ("address",), ("uniswapV2Pair",)),
+    # uniswapV3Pool()
+    ("uniswapV3Pool", "f55ebd2a", ("address",), ("uniswapV3Pool",)),
+    # name()
+    ("name", "06fdde03", ("string",), ("name",)),
+    # symbol()
+    ("symbol", "95d89b41", ("string",), ("symbol",)),
+)
+
+COLUMNS = ("address",) + tuple(column for getter in GETTERS for column in getter[3]) + ("failed",)
+
+def encode_aggregate3(calls):
+    # calls - список (target, calldata); allowFailure всегда true, чтобы один сломанный токен
+    # не откатывал весь пакет
+    head = bytearray()
+    body = bytearray()
+    for target, data in calls:
+        head += (32 * len(calls) + len(body)).to_bytes(32, "big")
+        body += bytes(12) + bytes.fromhex(target[2:])
+        body += (1).to_bytes(32, "big")
+        body += (96).to_bytes(32, "big")
+        body += len(data).to_bytes(32, "big")
+        body += data + bytes(-len(data) % 32)
+    out = AGGREGATE3_SELECTOR + (32).to_bytes(32, "big") + len(calls).to_bytes(32, "big") + head + body
+    return "0x" + out.hex()
+
+def decode_aggregate3(data):
+    # Result[] = (bool success, bytes returnData)[]
+    data = bytes.fromhex(data[2:])
+    start = int.from_bytes(data[:32], "big")
+    count = int.from_bytes(data[start:start + 32], "big")
+    base = start + 32
+    results = []
+    for i in range(count):
+        item = base + int.from_bytes(data[base + 32 * i:base + 32 * i + 32], "big")
+        success = any(data[item:item + 32])
+        offset = item + int.from_bytes(data[item + 32:item + 64], "big")
+        length = int.from_bytes(data[offset:offset + 32], "big")
+        results.append(data[offset + 32:offset + 32 + length] if success else None)
+    return results
+
+class TokenSnapshot:
+    # Все вызовы снимка идут к одному блоку. Multicall3 упаковывает batch_size вызовов в один eth_call,
+    # без него (локальный Hardhat node) - JSON-RPC batch из batch_size eth_call
+    def __init__(self, rpc, block=None, mode="auto", batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
+        self.rpc = rpc
+        self.block = rpc.block_number() if block is None else block
+        self.block_tag = hex(self.block)
+        self.block_hash = rpc.call("eth_getBlockByNumber", self.block_tag, False)["hash"]
+        if mode == "auto":
+            mode = "multicall" if len(rpc.get_code(MULTICALL3_ADDRESS, self.block_tag)) > 2 else "batch"
+        self.mode = mode
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def _run_batch(self, calls):
+        results = self.rpc.batch([
+            ("eth_call", ({"to": target, "data": "0x" + data.hex()}, self.block_tag)) for target, data in calls
+        ])
+        return [None if isinstance(r, verifier.RpcError) else bytes.fromhex(r[2:]) for r in results]
+
+    def _run_multicall(self, calls):
+        return decode_aggregate3(self.rpc.eth_call(MULTICALL3_ADDRESS, encode_aggregate3(calls), self.block_tag))
+
+    def take(self, addresses):
+        calls = [(address, bytes.fromhex(getter[1])) for address in addresses for getter in GETTERS]
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        run = self._run_multicall if self.mode == "multicall" else self._run_batch
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            raw = [result for chunk in executor.map(run, chunks) for result in chunk]
+
+        columns = {column: [] for column in COLUMNS}
+        results = iter(raw)
+        for address in addresses:
+            columns["address"].append(address)
+            failed = []
+            for name, _, types, names in GETTERS:
+                data = next(results)
+                values = None
+                if data:
+                    try:
+                        values = verifier.get_abi_decoder(types).decode(data)
+                    except ValueError:
+                        pass
+                if values is None:
+                    failed.append(name)
+                    values = (None,) * len(names)
+                for column, value in zip(names, values):
+                    columns[column].append(value)
+            columns["failed"].append(failed)
+        return columns
+
+def write_csv(columns, out):
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    for row in zip(*(columns[column] for column in COLUMNS)):
+        writer.writerow([";".join(value) if isinstance(value, list) else value for value in row])
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot Token configuration at one block")
+    parser.add_argument("tokens", help="JSON list or JSONL of token addresses ('-' for stdin)")
+    parser.add_argument("--rpc-url", default=verifier.env_setting("REACT_APP_RPC_URL", "http://127.0.0.1:8545"))
+    parser.add_argument("--block", type=int, help="block number, defaults to the latest block")
+    parser.add_argument("--mode", choices=("auto", "multicall", "batch"), default="auto",
+                        help="auto uses Multicall3 when it is deployed at the block")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="calls per request")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="requests in flight")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", help="write to a file instead of stdout")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    tokens = [row["address"] for row in verifier.load_rows(args.tokens)]
+    snapshot = TokenSnapshot(verifier.RpcClient(args.rpc_url), args.block, args.mode, args.batch_size, args.workers)
+    columns = snapshot.take(tokens)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(columns, out)
+        else:
+            # Большие uint256 - строками, чтобы JSON читался без потери точности
+            json.dump({
+                "block": snapshot.block,
+                "blockHash": snapshot.block_hash,
+                "mode": snapshot.mode,
+                "rows": len(tokens),
+                "columns": {
+                    column: [str(v) if isinstance(v, int) and not isinstance(v, bool) else v for v in values]
+                    for column, values in columns.items()
+                },
+            }, out)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(tokens)} tokens at block {snapshot.block} via {snapshot.mode} in {time.monotonic() - started:.2f}s",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+def load_verifier():
+    # verify-contract.py нельзя импортировать по имени из-за дефиса. Модуль регистрируется в sys.modules:
+    # так он загружается один раз, а его функции можно передавать в ProcessPoolExecutor.
+    module = sys.modules.get("verify_contract")
+    if module is None:
+        path = Path(__file__).resolve().with_name("verify-contract.py")
+        spec = importlib.util.spec_from_file_location("verify_contract", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["verify_contract"] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules["verify_contract"]
+            raise
+    return module
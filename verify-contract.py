@@ -1,6 +1,29 @@
-import requests
-import time
+import argparse
+import collections
+import csv
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import os
+import posixpath
+import queue
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
 
 def get_flattened_contract():
     return """// SPDX-License-Identifier: MIT
@@ -613,63 +636,3500 @@ contract Token is ERC20, Ownable, Pausable {
     }
 }"""
 
-def verify_contract():
-    url = "https://api-testnet.bscscan.com/api"
-    
-    contract_code = get_flattened_contract()
-    
-    params = {
-        "apikey": "A12FVH4CZCY6B7C98VJRDWSK7U4Y5UI2X4",
+EXPLORER_URL = "https://api-testnet.bscscan.com/api"
+
+DEFAULT_CONTRACT_ADDRESS = "0xc2697d924fe6cf2eb3dfe4ec6c7bcf2dbfc10966"
+DEFAULT_CONSTRUCTOR_ARGUMENTS = "000000000000000000000000000000000000000000000000000000000000004000000000000000000000000000000000000000000000000000000000000000800000000000000000000000000000000000000000000000000000000000000004004D554D550000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000034D554D00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000186A00000000000000000000000000000000000000000000000000000000000000006000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000A000000000000000000000000000000000000000000000000000000000000000E000000000000000000000000000000000000000000000000000000000000001200000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000186A000000000000000000000000037160534b276b54f21b831663d55f12a5aaf68c8000000000000000000000000000000000000000000000000000000000000000B68747470733A2F2F2E2E2E000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000B68747470733A2F2F2E2E2E000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000F68747470733A2F2F742E6D652F2E2E2E0000000000000000000000000000000000"
+
+METRIC_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+POLL_FIRST_DELAY = 1.0
+POLL_MIN_INTERVAL = 2.0
+POLL_MAX_INTERVAL = 60.0
+POLL_JITTER = 0.2
+POLL_TIMEOUT = 900
+EXPECTED_QUEUE_TIME = 15.0
+DEFAULT_CONCURRENCY = 8
+
+DEFAULT_EXPLORER = "bscTestnet"
+EXPLORERS = {
+    "bscTestnet": {"url": "https://api-testnet.bscscan.com/api", "chainId": 97, "apiKeyEnv": "BSCSCAN_API_KEY"},
+    "bsc": {"url": "https://api.bscscan.com/api", "chainId": 56, "apiKeyEnv": "BSCSCAN_API_KEY"},
+    "ethereum": {"url": "https://api.etherscan.io/api", "chainId": 1, "apiKeyEnv": "ETHERSCAN_API_KEY"},
+    "sepolia": {"url": "https://api-sepolia.etherscan.io/api", "chainId": 11155111, "apiKeyEnv": "ETHERSCAN_API_KEY"},
+}
+
+EXPLORER_POOL_SIZE = 32
+EXPLORER_RATE_LIMIT = 5.0
+KEYLESS_RATE_LIMIT = 0.2
+RATE_HEADROOM = 0.9
+THROTTLE_RETRIES = 5
+THROTTLE_BACKOFF = 1.0
+THROTTLE_MAX_BACKOFF = 30.0
+EXPLORER_TIMEOUT = (10, 60)
+POLL_REQUEST_TIMEOUT = (5, 15)
+EXPLORER_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 8.0
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MIN_DELAY = 0.25
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30.0
+
+ROOT_DIR = Path(__file__).resolve().parent
+ENV_FILE = ROOT_DIR / ".env.production"
+
+CACHE_DIR = ROOT_DIR / ".verify-cache"
+VERIFICATION_CACHE_PATH = CACHE_DIR / "verifications.sqlite"
+VERIFICATION_FAILURE_TTL = 3600
+JOB_STORE_PATH = CACHE_DIR / "jobs.sqlite"
+SOURCE_CACHE_PATH = CACHE_DIR / "sources.sqlite"
+SOURCE_NEGATIVE_TTL = 600
+SOURCE_MEMORY_SIZE = 4096
+SOURCE_LOOKUP_WORKERS = 4
+JOB_LEASE_SECONDS = 300
+JOB_LEASE_BATCH = 64
+JOB_RETRY_DELAY = 60
+MANIFEST_LANE_SIZE = 256
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8787
+DAEMON_KEEP_FINISHED = 1000
+DAEMON_STREAM_TIMEOUT = POLL_TIMEOUT + 60
+
+ARTIFACTS_DIR = ROOT_DIR / "artifacts"
+DEFAULT_SOURCE_NAME = "contracts/Token.sol"
+BUILD_INFO_CHUNK = 64 * 1024
+SOLIDITY_FILES_CACHE = ROOT_DIR / "cache" / "solidity-files-cache.json"
+FLATTEN_STATE_PATH = CACHE_DIR / "flatten.json"
+EXPLORERS_CONFIG = ROOT_DIR / "explorers.json"
+
+SOLC_BINARIES_URL = "https://binaries.soliditylang.org"
+SOLC_CACHE_DIR = CACHE_DIR / "solc"
+COMPILE_CACHE_DIR = CACHE_DIR / "compiled"
+# Компиляторы, уже скачанные Hardhat (Linux и macOS)
+HARDHAT_COMPILERS_DIRS = (
+    Path.home() / ".cache" / "hardhat-nodejs" / "compilers-v2",
+    Path.home() / "Library" / "Caches" / "hardhat-nodejs" / "compilers-v2",
+)
+SOLC_TIMEOUT = 600
+# Сетка поиска настроек: первыми идут настройки из hardhat.config.js
+SEARCH_VERSIONS = ("0.8.19", "0.8.20", "0.8.21", "0.8.22", "0.8.23", "0.8.24")
+SEARCH_RUNS = (200, 1, 100, 1000, 10000)
+COMPILE_OUTPUT_SELECTION = {"*": {"*": [
+    "abi",
+    "evm.bytecode.object",
+    "evm.deployedBytecode.object",
+    "evm.deployedBytecode.immutableReferences",
+]}}
+
+CREATIONS_CACHE_PATH = CACHE_DIR / "creations.sqlite"
+CREATION_LOOKUP_BATCH = 5
+RECOVERY_BATCH = 50
+TRACE_BATCH = 10
+RECOVERY_WORKERS = 4
+RECOVERY_CHUNK = 200
+
+RPC_TIMEOUT = 30
+INDEX_CHECKPOINT_PATH = CACHE_DIR / "token-index.json"
+LOG_CHUNK_INITIAL = 2000
+LOG_CHUNK_MAX = 100000
+LOG_SPARSE_THRESHOLD = 100
+
+# keccak256("TokenCreated(address,address)")
+TOKEN_CREATED_TOPIC = "0xd5f9bdf12adf29dab0248c349842c3822d53ae2bb4f36352f301630d018c8139"
+
+STATUS_PENDING = "pending"
+STATUS_VERIFIED = "verified"
+STATUS_ALREADY_VERIFIED = "already_verified"
+STATUS_THROTTLED = "throttled"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+JOB_PENDING_SUBMIT = "pending_submit"
+JOB_SUBMITTED = "submitted"
+JOB_POLLING = "polling"
+JOB_VERIFIED = "verified"
+JOB_FAILED = "failed"
+JOB_FINAL_STATES = (JOB_VERIFIED, JOB_FAILED)
+
+_STATUS_MESSAGES = {
+    "pending in queue": STATUS_PENDING,
+    "pass - verified": STATUS_VERIFIED,
+    "already verified": STATUS_ALREADY_VERIFIED,
+    "contract source code already verified": STATUS_ALREADY_VERIFIED,
+    "max rate limit reached": STATUS_THROTTLED,
+}
+
+def classify_status(result):
+    message = str(result.get("result") or result.get("message") or "").strip().lower()
+    for prefix, status in _STATUS_MESSAGES.items():
+        if message.startswith(prefix):
+            return status
+    return STATUS_FAILED
+
+class Instrumentation:
+    # Длительности фаз (сборка payload, отправка, опрос, задача целиком), размер payload,
+    # число попыток и итоговые статусы: JSON-строки в log_stream и счётчики для OpenMetrics
+    def __init__(self, log_stream=None):
+        self.log_stream = log_stream
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._payload_bytes = {}
+        self._jobs = {}
+        self._poll_attempts = 0
+
+    def record(self, phase, duration, **fields):
+        with self._lock:
+            histogram = self._durations.setdefault(phase, [0] * (len(METRIC_BUCKETS) + 2))
+            for i, bound in enumerate(METRIC_BUCKETS):
+                if duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += duration
+            if "payload_bytes" in fields:
+                self._payload_bytes[phase] = self._payload_bytes.get(phase, 0) + fields["payload_bytes"]
+            if phase == "job":
+                status = fields.get("status")
+                self._jobs[status] = self._jobs.get(status, 0) + 1
+                self._poll_attempts += fields.get("attempts") or 0
+
+            if self.log_stream is not None:
+                event = {"ts": round(time.time(), 6), "phase": phase, "duration": round(duration, 6), **fields}
+                self.log_stream.write(json.dumps(event) + "\n")
+                self.log_stream.flush()
+
+    def openmetrics(self):
+        lines = [
+            "# TYPE verify_phase_duration_seconds histogram",
+            "# UNIT verify_phase_duration_seconds seconds",
+            "# HELP verify_phase_duration_seconds Time spent in each verification phase.",
+        ]
+        with self._lock:
+            for phase, histogram in sorted(self._durations.items()):
+                for bound, count in zip(METRIC_BUCKETS, histogram):
+                    lines.append(f'verify_phase_duration_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+                lines.append(f'verify_phase_duration_seconds_bucket{{phase="{phase}",le="+Inf"}} {histogram[-2]}')
+                lines.append(f'verify_phase_duration_seconds_count{{phase="{phase}"}} {histogram[-2]}')
+                lines.append(f'verify_phase_duration_seconds_sum{{phase="{phase}"}} {histogram[-1]:.6f}')
+
+            lines += ["# TYPE verify_payload_bytes counter", "# UNIT verify_payload_bytes bytes"]
+            for phase, total in sorted(self._payload_bytes.items()):
+                lines.append(f'verify_payload_bytes_total{{phase="{phase}"}} {total}')
+
+            lines.append("# TYPE verify_jobs counter")
+            for status, count in sorted(self._jobs.items(), key=lambda item: str(item[0])):
+                lines.append(f'verify_jobs_total{{status="{status}"}} {count}')
+
+            lines += ["# TYPE verify_poll_attempts counter", f"verify_poll_attempts_total {self._poll_attempts}"]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.openmetrics())
+        os.replace(tmp, path)
+
+class _Span:
+    def __init__(self, instrumentation, phase, fields):
+        self.instrumentation = instrumentation
+        self.phase = phase
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["error"] = str(exc) or exc_type.__name__
+        self.instrumentation.record(self.phase, time.perf_counter() - self.started, **self.fields)
+        return False
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+_NULL_SPAN = _NullSpan()
+_instrumentation = None
+
+def enable_instrumentation(log_stream=None):
+    global _instrumentation
+    _instrumentation = Instrumentation(log_stream)
+    return _instrumentation
+
+def disable_instrumentation():
+    global _instrumentation
+    _instrumentation = None
+
+def span(phase, **fields):
+    # При выключенной инструментации - один и тот же пустой контекстный менеджер
+    if _instrumentation is None:
+        return _NULL_SPAN
+    return _Span(_instrumentation, phase, fields)
+
+def record_job(job):
+    if _instrumentation is not None:
+        _instrumentation.record("job", job.get("elapsed") or 0.0, address=job.get("address"),
+                                status=job.get("status"), attempts=job.get("attempts"),
+                                cached=bool(job.get("cached")))
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+
+    def wait_time(self, now):
+        # 0 - токен взят, иначе сколько ждать до следующего
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class ApiKeyPool:
+    # Свой token bucket на каждый ключ; запрос берёт первый ключ со свободным токеном.
+    # На "Max rate limit reached" ключ замораживается с растущей задержкой.
+    def __init__(self, keys, rate=EXPLORER_RATE_LIMIT):
+        keys = [key for key in keys if key] or [""]
+        if keys == [""]:
+            rate = min(rate, KEYLESS_RATE_LIMIT)
+        # Небольшой запас под неравномерность доставки запросов до эксплорера
+        self.buckets = {key: TokenBucket(rate * RATE_HEADROOM) for key in keys}
+        self.calls = dict.fromkeys(keys, 0)
+        self.throttles = dict.fromkeys(keys, 0)
+        self._keys = keys
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # (ключ, 0) или (None, сколько ждать до ближайшего токена); вызывается под _lock
+        now = time.monotonic()
+        shortest = None
+        for i in range(len(self._keys)):
+            key = self._keys[(self._next + i) % len(self._keys)]
+            wait = self.buckets[key].wait_time(now)
+            if wait == 0:
+                self._next = (self._next + i + 1) % len(self._keys)
+                self.calls[key] += 1
+                return key, 0.0
+            shortest = wait if shortest is None else min(shortest, wait)
+        return None, shortest
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                key, wait = self._take()
+            if key is not None:
+                return key
+            time.sleep(wait)
+
+    def try_acquire(self):
+        with self._lock:
+            return self._take()[0]
+
+    def throttled(self, key):
+        with self._lock:
+            bucket = self.buckets[key]
+            bucket.strikes += 1
+            bucket.tokens = 0
+            bucket.paused_until = time.monotonic() + min(THROTTLE_MAX_BACKOFF, THROTTLE_BACKOFF * 2 ** (bucket.strikes - 1))
+            self.throttles[key] += 1
+
+    def succeeded(self, key):
+        with self._lock:
+            self.buckets[key].strikes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                f"{i}:{key[:4]}…" if key else "<none>": {"calls": self.calls[key], "throttled": self.throttles[key]}
+                for i, key in enumerate(self._keys)
+            }
+
+def api_keys_from_env(name):
+    # NAME может содержать несколько ключей через запятую, NAMES - дополнительный список
+    keys = []
+    for value in (env_setting(name), env_setting(name + "S")):
+        for key in (value or "").split(","):
+            if key.strip() and key.strip() not in keys:
+                keys.append(key.strip())
+    return keys
+
+class ExplorerError(Exception):
+    pass
+
+class TransientExplorerError(ExplorerError):
+    # 5xx, таймаут, обрыв соединения, HTML вместо JSON - имеет смысл повторить
+    pass
+
+class CircuitOpenError(ExplorerError):
+    pass
+
+class CircuitBreaker:
+    # closed -> open после threshold временных ошибок подряд; через reset_after пропускается
+    # один пробный запрос (half-open), его успех закрывает цепь, неудача снова открывает
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_after=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self, endpoint):
+        with self._lock:
+            if self.state == "closed":
+                return
+            wait_for = self._opened_at + self.reset_after - time.monotonic()
+            if self.state == "open" and wait_for <= 0:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"{endpoint} is unavailable, circuit open for {max(0.0, wait_for):.0f}s more")
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state = "open"
+                self.opened += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+@functools.lru_cache(maxsize=None)
+def circuit_breaker_for(url):
+    # Общий на все клиенты одного эндпоинта
+    return CircuitBreaker()
+
+class LatencyWindow:
+    # Последние window задержек успешных ответов; p95 - порог для дублирующего запроса
+    def __init__(self, window=HEDGE_WINDOW):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+    def hedge_delay(self):
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, self.percentile(95))
+
+class ExplorerClient:
+    # Один пул keep-alive соединений на все вызовы API эксплорера.
+    # Временные ошибки повторяются с экспоненциальной задержкой, постоянные (4xx) - нет;
+    # GET-запросы идемпотентны, и если ответа нет дольше p95, уходит дубль - берётся первый ответ.
+    def __init__(self, url=EXPLORER_URL, api_keys=None, pool_size=EXPLORER_POOL_SIZE,
+                 timeout=EXPLORER_TIMEOUT, name=DEFAULT_EXPLORER, rate_limit=EXPLORER_RATE_LIMIT,
+                 retries=EXPLORER_RETRIES, hedge=True):
+        self.name = name
+        self.url = url
+        if api_keys is None:
+            api_keys = api_keys_from_env(EXPLORERS[DEFAULT_EXPLORER]["apiKeyEnv"])
+        self.keys = ApiKeyPool(api_keys, rate_limit)
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge = hedge
+        self.breaker = circuit_breaker_for(url)
+        # Отдельно по методу: большие POST verifysourcecode не должны поднимать порог для опросов
+        self.latency = {"GET": LatencyWindow(), "POST": LatencyWindow()}
+        self.counters = {"retries": 0, "hedged": 0, "hedgeWins": 0, "transient": 0, "permanent": 0}
+        self._lock = threading.Lock()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix=f"{name}-hedge")
+
+    def get(self, params, timeout=None):
+        return self._request("GET", params, timeout or self.timeout)
+
+    def post(self, params, timeout=None):
+        return self._request("POST", params, timeout or self.timeout)
+
+    def _count(self, name):
+        # Запросы идут из нескольких потоков (пул верификации, поллер, хеджи)
+        with self._lock:
+            self.counters[name] += 1
+
+    def _request(self, method, params, timeout):
+        throttles = 0
+        failures = 0
+        while True:
+            self.breaker.allow(self.name)
+            try:
+                if method == "GET" and self.hedge:
+                    result = self._send_hedged(params, timeout)
+                else:
+                    result, elapsed = self._send(method, params, timeout)
+                    if elapsed is not None:
+                        self.latency[method].add(elapsed)
+            except TransientExplorerError as e:
+                self.breaker.failure()
+                failures += 1
+                if failures > self.retries:
+                    raise ExplorerError(f"{self.name}: {e} (after {failures} attempts)") from e
+                self._count("retries")
+                delay = min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2 ** (failures - 1))
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                continue
+            except ExplorerError:
+                self.breaker.success()
+                raise
+            self.breaker.success()
+            if classify_status(result) == STATUS_THROTTLED and throttles < THROTTLE_RETRIES:
+                throttles += 1
+                continue
+            return result
+
+    def _send(self, method, params, timeout, key=None):
+        # Возвращает (ответ, время сети без ожидания токена лимита); None вместо времени - ответ 429
+        if key is None:
+            key = self.keys.acquire()
+        started = time.monotonic()
+        try:
+            if method == "GET":
+                response = self.session.get(self.url, params=dict(params, apikey=key), timeout=timeout)
+            else:
+                response = self.session.post(self.url, data=dict(params, apikey=key), timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            self._count("transient")
+            raise TransientExplorerError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code == 429:
+            self.keys.throttled(key)
+            return {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}, None
+        if response.status_code >= 500 or response.status_code == 408:
+            self._count("transient")
+            raise TransientExplorerError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            self._count("permanent")
+            raise ExplorerError(f"{self.name}: HTTP {response.status_code}: {response.text[:200]}")
+        try:
+            result = response.json()
+        except ValueError:
+            result = None
+        if not isinstance(result, dict):
+            self._count("transient")
+            raise TransientExplorerError(f"Non-JSON response: {response.text[:100]!r}")
+
+        elapsed = time.monotonic() - started
+        if classify_status(result) == STATUS_THROTTLED:
+            self.keys.throttled(key)
+        else:
+            self.keys.succeeded(key)
+        return result, elapsed
+
+    def _send_hedged(self, params, timeout):
+        # Таймер дубля и окно задержек считают только время сети: ключ берётся до запуска таймера,
+        # иначе порог рос бы вместе с локальной очередью к лимиту. Проигравший дубль в окно не попадает.
+        delay = self.latency["GET"].hedge_delay()
+        first = self._hedge_pool.submit(self._send, "GET", params, timeout, self.keys.acquire())
+        if delay is None or wait([first], timeout=delay).done:
+            result, elapsed = first.result()
+            if elapsed is not None:
+                self.latency["GET"].add(elapsed)
+            return result
+
+        # Дубль только на свободный токен: при исчерпанном лимите он отнял бы квоту у других запросов
+        key = self.keys.try_acquire()
+        if key is None:
+            result, elapsed = first.result()
+            if elapsed is not None:
+                self.latency["GET"].add(elapsed)
+            return result
+        self._count("hedged")
+        second = self._hedge_pool.submit(self._send, "GET", params, timeout, key)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, elapsed = future.result()
+                except ExplorerError as e:
+                    error = e
+                    continue
+                if future is second:
+                    self._count("hedgeWins")
+                if elapsed is not None:
+                    self.latency["GET"].add(elapsed)
+                return result
+        raise error
+
+    def submit_verification(self, params):
+        return self.post(params)
+
+    def check_verification_status(self, guid):
+        return self.get({
+            "module": "contract",
+            "action": "checkverifystatus",
+            "guid": guid
+        }, POLL_REQUEST_TIMEOUT)
+
+    def get_contract_creation(self, addresses):
+        # Не больше CREATION_LOOKUP_BATCH адресов за вызов
+        result = self.get({
+            "module": "contract",
+            "action": "getcontractcreation",
+            "contractaddresses": ",".join(addresses),
+        })
+        if result.get("status") != "1" or not isinstance(result.get("result"), list):
+            return []
+        return result["result"]
+
+    def get_source_code(self, address):
+        result = self.get({
+            "module": "contract",
+            "action": "getsourcecode",
+            "address": address,
+        })
+        # Неверифицированный контракт - это status 1 с пустым SourceCode; status 0 (лимит, неверный
+        # ключ, NOTOK) ничего не говорит о верификации и не должен кэшироваться как отрицательный ответ
+        if result.get("status") != "1" or not isinstance(result.get("result"), list) or not result["result"]:
+            raise ExplorerError(f"{self.name}: getsourcecode {address}: "
+                                f"{result.get('result') or result.get('message', 'Unknown error')}")
+        return result["result"][0]
+
+    def connection_stats(self):
+        pools = self.adapter.poolmanager.pools
+        requests_sent = 0
+        connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": requests_sent - connections,
+        }
+
+    def resilience_stats(self):
+        p95 = {method: window.percentile(95) for method, window in self.latency.items()}
+        with self._lock:
+            counters = dict(self.counters)
+        return dict(counters, breaker=self.breaker.state, breakerOpened=self.breaker.opened,
+                    p95={method: round(value, 3) if value is not None else None for method, value in p95.items()})
+
+    def close(self):
+        self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+_explorer_client = None
+_explorer_client_lock = threading.Lock()
+
+def get_explorer_client():
+    global _explorer_client
+    with _explorer_client_lock:
+        if _explorer_client is None:
+            _explorer_client = ExplorerClient()
+        return _explorer_client
+
+def set_explorer_client(client):
+    global _explorer_client
+    with _explorer_client_lock:
+        _explorer_client = client
+
+@functools.lru_cache(maxsize=16)
+def _source_digest(source):
+    return hashlib.sha256(source.encode()).hexdigest()
+
+class VerificationCache:
+    # Результаты отправок по хэшу (адрес, исходник, настройки компилятора, аргументы конструктора).
+    # Успешные записи хранятся бессрочно (или до max_age), неудачные - failure_ttl секунд.
+    def __init__(self, path=VERIFICATION_CACHE_PATH, failure_ttl=VERIFICATION_FAILURE_TTL, max_age=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.failure_ttl = failure_ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS verifications (
+                key TEXT PRIMARY KEY,
+                address TEXT NOT NULL,
+                guid TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS verifications_address ON verifications (address)")
+        self._db.commit()
+
+    @staticmethod
+    def key(params, explorer=EXPLORER_URL):
+        fields = {k: v for k, v in params.items() if k != "apikey"}
+        fields["explorer"] = explorer
+        fields["sourceCode"] = _source_digest(fields["sourceCode"])
+        fields["contractaddress"] = fields["contractaddress"].lower()
+        fields["constructorArguments"] = fields.get("constructorArguments", "").lower()
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT address, guid, status, result, updated_at FROM verifications WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        address, guid, status, result, updated_at = row
+        age = time.time() - updated_at
+        if self.max_age is not None and age > self.max_age:
+            return None
+        if status not in (STATUS_VERIFIED, STATUS_ALREADY_VERIFIED, STATUS_PENDING) and age > self.failure_ttl:
+            return None
+        return {"address": address, "guid": guid, "status": status, "result": result, "updated_at": updated_at}
+
+    def put(self, key, address, status, guid=None, result=None):
+        if status in (STATUS_TIMEOUT, STATUS_ERROR):
+            # Итога ещё нет: с GUID запись остаётся pending, и следующий запуск продолжит опрос
+            if not guid:
+                return
+            status, result = STATUS_PENDING, None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO verifications (key, address, guid, status, result, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, address.lower(), guid, status, result, time.time()),
+            )
+            self._db.commit()
+
+    def invalidate(self, address=None):
+        with self._lock:
+            if address is None:
+                cursor = self._db.execute("DELETE FROM verifications")
+            else:
+                cursor = self._db.execute("DELETE FROM verifications WHERE address = ?", (address.lower(),))
+            self._db.commit()
+            return cursor.rowcount
+
+    def evict(self, older_than=None):
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM verifications WHERE status NOT IN (?, ?, ?) AND updated_at < ?",
+                (STATUS_VERIFIED, STATUS_ALREADY_VERIFIED, STATUS_PENDING, now - self.failure_ttl),
+            )
+            removed = cursor.rowcount
+            if older_than is not None:
+                cursor = self._db.execute("DELETE FROM verifications WHERE updated_at < ?", (now - older_than,))
+                removed += cursor.rowcount
+            self._db.commit()
+            return removed
+
+    def close(self):
+        self._db.close()
+
+class JobStore:
+    # Очередь верификаций, переживающая падение процесса: GUID сохраняется сразу после отправки,
+    # и после перезапуска задача продолжает опрашиваться, а не отправляется заново.
+    # Несколько процессов делят одну базу через аренду (lease_owner, lease_expires).
+    def __init__(self, path=JOB_STORE_PATH, lease_seconds=JOB_LEASE_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                explorer TEXT NOT NULL,
+                address TEXT NOT NULL,
+                deployment TEXT NOT NULL,
+                state TEXT NOT NULL,
+                guid TEXT,
+                status TEXT,
+                result TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (explorer, state, lease_expires)")
+
+    @staticmethod
+    def job_id(explorer, address):
+        return f"{explorer}:{address.lower()}"
+
+    def add(self, deployment, explorer):
+        now = time.time()
+        job_id = self.job_id(explorer, deployment["address"])
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO jobs (id, explorer, address, deployment, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, explorer, deployment["address"].lower(), json.dumps(deployment), JOB_PENDING_SUBMIT,
+                 now, now),
+            )
+            if cursor.rowcount == 1:
+                return True
+            # Строка манифеста могла сместиться между запусками: результат должен ссылаться на текущую
+            if deployment.get("line") is not None:
+                self._db.execute("UPDATE jobs SET deployment = json_set(deployment, '$.line', ?) WHERE id = ?",
+                                 (deployment["line"], job_id))
+            return False
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT address, deployment, state, guid, status, result, attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        address, deployment, state, guid, status, result, attempts = row
+        return {"address": address, "line": json.loads(deployment).get("line"), "state": state, "guid": guid,
+                "status": status, "result": result, "attempts": attempts}
+
+    def lease(self, owner, explorer, limit=JOB_LEASE_BATCH):
+        # BEGIN IMMEDIATE берёт блокировку записи до выборки, поэтому два процесса
+        # не могут арендовать одну и ту же задачу
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, deployment, state, guid FROM jobs "
+                    "WHERE explorer = ? AND state NOT IN (?, ?) AND (lease_expires IS NULL OR lease_expires < ?) "
+                    "ORDER BY created_at LIMIT ?",
+                    (explorer, *JOB_FINAL_STATES, now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE jobs SET lease_owner = ?, lease_expires = ? WHERE id = ?",
+                    [(owner, now + self.lease_seconds, row[0]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+        jobs = []
+        for job_id, deployment, state, guid in rows:
+            deployment = json.loads(deployment)
+            deployment["jobId"] = job_id
+            if state != JOB_PENDING_SUBMIT and guid:
+                deployment["guid"] = guid
+            jobs.append(deployment)
+        return jobs
+
+    def renew(self, owner):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE lease_owner = ? AND state NOT IN (?, ?)",
+                (time.time() + self.lease_seconds, owner, *JOB_FINAL_STATES),
+            )
+
+    def update(self, job_id, state, guid=None, status=None, result=None, attempts=None, retry_after=None):
+        # Конечные состояния и retry_after снимают аренду; retry_after откладывает следующую попытку
+        now = time.time()
+        release = state in JOB_FINAL_STATES or retry_after is not None
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, guid = COALESCE(?, guid), status = COALESCE(?, status), "
+                "result = COALESCE(?, result), attempts = attempts + COALESCE(?, 0), updated_at = ?, "
+                "lease_owner = CASE WHEN ? THEN NULL ELSE lease_owner END, "
+                "lease_expires = CASE WHEN ? THEN ? ELSE lease_expires END "
+                "WHERE id = ?",
+                (state, guid, status, result, attempts, now, release, release,
+                 now + (retry_after or 0) if release else None, job_id),
+            )
+
+    def release(self, owner):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?", (owner,)
+            )
+            return cursor.rowcount
+
+    def counts(self, explorer=None):
+        query = "SELECT explorer, state, COUNT(*) FROM jobs"
+        params = ()
+        if explorer is not None:
+            query += " WHERE explorer = ?"
+            params = (explorer,)
+        counts = {}
+        with self._lock:
+            for name, state, count in self._db.execute(query + " GROUP BY explorer, state", params):
+                counts.setdefault(name, {})[state] = count
+        return counts
+
+    def close(self):
+        self._db.close()
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _read_json_members(f, wanted, stop="output"):
+    # Читает верхнеуровневые поля JSON-объекта по частям и останавливается, как только
+    # все нужные поля найдены или дошли до поля stop
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = None
+    found = {}
+
+    while len(found) < len(wanted):
+        chunk = f.read(BUILD_INFO_CHUNK)
+        buffer += chunk
+        if pos is None:
+            pos = buffer.index("{") + 1
+
+        while len(found) < len(wanted):
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "}":
+                return found
+            try:
+                key, end = decoder.raw_decode(buffer, pos)
+                colon = buffer.index(":", end) + 1
+                while colon < len(buffer) and buffer[colon] in " \t\r\n":
+                    colon += 1
+                if key == stop:
+                    return found
+                value, end = decoder.raw_decode(buffer, colon)
+                if end >= len(buffer) and chunk:
+                    raise ValueError("value may be truncated")
+            except ValueError:
+                if not chunk:
+                    raise
+                break
+            if key in wanted:
+                found[key] = value
+            pos = end
+
+    return found
+
+@functools.lru_cache(maxsize=None)
+def load_build_info(path):
+    with open(path, encoding="utf-8") as f:
+        info = _read_json_members(f, ("solcVersion", "solcLongVersion", "input"))
+    # Строка standard-json собирается один раз и переиспользуется для всех адресов
+    info["inputJson"] = json.dumps(info["input"], separators=(",", ":"))
+    return info
+
+def find_build_info(source_name=DEFAULT_SOURCE_NAME, contract_name="Token"):
+    debug_file = ARTIFACTS_DIR / source_name / f"{contract_name}.dbg.json"
+    with open(debug_file) as f:
+        build_info = json.load(f)["buildInfo"]
+    return str((debug_file.parent / build_info).resolve())
+
+# Конструктор contracts/Token.sol (токены, которые создаёт TokenFactory, и scripts/args.js)
+TOKEN_CONSTRUCTOR_TYPES = ("string", "string", "uint256", "address[]", "address")
+
+# Конструктор Token из get_flattened_contract()
+FLATTENED_TOKEN_CONSTRUCTOR_TYPES = (
+    "string", "string", "uint256", "address[]",
+    "uint256", "uint256", "uint256",
+    "string", "string", "string",
+    "bool", "bool", "uint256", "address",
+)
+
+_ZERO_WORD = bytes(32)
+_TRUE_WORD = (1).to_bytes(32, "big")
+
+def _encode_uint(value):
+    if isinstance(value, str):
+        value = int(value, 16) if value.lower().startswith("0x") else int(value)
+    if value < 0 or value >= 1 << 256:
+        raise ValueError(f"uint256 out of range: {value}")
+    return value.to_bytes(32, "big")
+
+def _encode_address(value):
+    raw = bytes.fromhex(value[2:] if value.lower().startswith("0x") else value)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {value}")
+    return bytes(12) + raw
+
+def _encode_bool(value):
+    if isinstance(value, str):
+        value = {"true": True, "false": False, "1": True, "0": False}[value.lower()]
+    return _TRUE_WORD if value else _ZERO_WORD
+
+def _encode_bytes(raw, out):
+    out += len(raw).to_bytes(32, "big")
+    out += raw
+    out += bytes(-len(raw) % 32)
+
+_STATIC_ENCODERS = {
+    "uint256": _encode_uint,
+    "address": _encode_address,
+    "bool": _encode_bool,
+}
+
+class AbiEncoder:
+    # Раскладка head (какие слоты динамические, их кодировщики, размер head) считается один раз
+    # на сигнатуру. Буферы head и tail свои у каждого вызова: кодировщик общий для потоков.
+    def __init__(self, types):
+        self.types = tuple(types)
+        self.head_size = 32 * len(self.types)
+        self._slots = []
+        for i, abi_type in enumerate(self.types):
+            if abi_type in ("string", "bytes"):
+                self._slots.append((i * 32, abi_type, None))
+            elif abi_type.endswith("[]"):
+                item_type = abi_type[:-2]
+                if item_type not in _STATIC_ENCODERS:
+                    raise ValueError(f"Unsupported array type: {abi_type}")
+                self._slots.append((i * 32, "array", _STATIC_ENCODERS[item_type]))
+            elif abi_type in _STATIC_ENCODERS:
+                self._slots.append((i * 32, "static", _STATIC_ENCODERS[abi_type]))
+            else:
+                raise ValueError(f"Unsupported ABI type: {abi_type}")
+
+    def encode_bytes(self, values):
+        if len(values) != len(self.types):
+            raise ValueError(f"Expected {len(self.types)} values, got {len(values)}")
+
+        head = bytearray(self.head_size)
+        tail = bytearray()
+        for (offset, kind, encoder), value in zip(self._slots, values):
+            if kind == "static":
+                head[offset:offset + 32] = encoder(value)
+                continue
+
+            head[offset:offset + 32] = (self.head_size + len(tail)).to_bytes(32, "big")
+            if kind == "array":
+                tail += len(value).to_bytes(32, "big")
+                for item in value:
+                    tail += encoder(item)
+            elif kind == "string":
+                _encode_bytes(value.encode("utf-8"), tail)
+            else:
+                _encode_bytes(bytes.fromhex(value[2:] if value.startswith("0x") else value), tail)
+
+        return bytes(head) + bytes(tail)
+
+    def encode(self, values):
+        return self.encode_bytes(values).hex()
+
+    def encode_batch(self, rows):
+        for values in rows:
+            yield self.encode(values)
+
+@functools.lru_cache(maxsize=None)
+def get_abi_encoder(types):
+    return AbiEncoder(types)
+
+def _decode_uint(word):
+    return int.from_bytes(word, "big")
+
+def _decode_address(word):
+    return "0x" + word[12:].hex()
+
+def _decode_bool(word):
+    return any(word)
+
+_STATIC_DECODERS = {
+    "uint256": _decode_uint,
+    "uint8": _decode_uint,
+    "address": _decode_address,
+    "bool": _decode_bool,
+    "bytes32": lambda word: "0x" + word.hex(),
+}
+
+class AbiDecoder:
+    # Обратная операция к AbiEncoder для тех же плоских типов: раскладка head считается один раз
+    def __init__(self, types):
+        self.types = tuple(types)
+        self.head_size = 32 * len(self.types)
+        self._slots = []
+        for i, abi_type in enumerate(self.types):
+            if abi_type in ("string", "bytes"):
+                self._slots.append((i * 32, abi_type, None))
+            elif abi_type.endswith("[]"):
+                item_type = abi_type[:-2]
+                if item_type not in _STATIC_DECODERS:
+                    raise ValueError(f"Unsupported array type: {abi_type}")
+                self._slots.append((i * 32, "array", _STATIC_DECODERS[item_type]))
+            elif abi_type in _STATIC_DECODERS:
+                self._slots.append((i * 32, "static", _STATIC_DECODERS[abi_type]))
+            else:
+                raise ValueError(f"Unsupported ABI type: {abi_type}")
+
+    def decode(self, data):
+        if isinstance(data, str):
+            data = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+        if len(data) < self.head_size:
+            raise ValueError(f"ABI data too short: {len(data)} < {self.head_size} bytes")
+
+        values = []
+        for offset, kind, decoder in self._slots:
+            word = data[offset:offset + 32]
+            if kind == "static":
+                values.append(decoder(word))
+                continue
+
+            start = int.from_bytes(word, "big")
+            if start + 32 > len(data):
+                raise ValueError(f"ABI offset out of range: {start}")
+            length = int.from_bytes(data[start:start + 32], "big")
+            body = start + 32
+            if kind == "array":
+                if body + 32 * length > len(data):
+                    raise ValueError(f"ABI array out of range: {length} items at {start}")
+                values.append([decoder(data[body + 32 * i:body + 32 * i + 32]) for i in range(length)])
+                continue
+
+            raw = data[body:body + length]
+            if len(raw) != length:
+                raise ValueError(f"ABI {kind} out of range: {length} bytes at {start}")
+            values.append(raw.decode("utf-8", errors="replace") if kind == "string" else "0x" + raw.hex())
+        return tuple(values)
+
+@functools.lru_cache(maxsize=None)
+def get_abi_decoder(types):
+    return AbiDecoder(types)
+
+def constructor_types_for(values):
+    if len(values) == len(TOKEN_CONSTRUCTOR_TYPES):
+        return TOKEN_CONSTRUCTOR_TYPES
+    if len(values) == len(FLATTENED_TOKEN_CONSTRUCTOR_TYPES):
+        return FLATTENED_TOKEN_CONSTRUCTOR_TYPES
+    raise ValueError(f"No Token constructor takes {len(values)} arguments")
+
+def encode_constructor_arguments(values, types=None):
+    return get_abi_encoder(tuple(types or constructor_types_for(values))).encode(values)
+
+def encode_constructor_batch(rows, types=None):
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    encoder = get_abi_encoder(tuple(types or constructor_types_for(first)))
+    yield encoder.encode(first)
+    yield from encoder.encode_batch(rows)
+
+_JS_TOKENS = re.compile(r'"(?:\\.|[^"\\])*"|\'((?:\\.|[^\'\\])*)\'|//[^\n]*|/\*.*?\*/', re.S)
+
+def parse_js_args(text):
+    # Формат scripts/args.js: module.exports = [ ... ]; с комментариями и висячими запятыми
+    def token(match):
+        if match.group(0).startswith("/"):
+            return ""
+        if match.group(1) is not None:
+            return json.dumps(match.group(1).replace("\\'", "'"))
+        return match.group(0)
+
+    text = _JS_TOKENS.sub(token, text)
+    text = re.sub(r"^\s*module\.exports\s*=\s*", "", text.strip()).rstrip(";").strip()
+    text = re.sub(r",(\s*[\]}])", r"\1", text)
+    return json.loads(text)
+
+def load_js_args(path):
+    with open(path) as f:
+        return parse_js_args(f.read())
+
+def _constructor_arguments(deployment):
+    if deployment.get("constructorArguments"):
+        return deployment["constructorArguments"]
+    if deployment.get("constructorArgs") is not None:
+        return encode_constructor_arguments(deployment["constructorArgs"], deployment.get("constructorTypes"))
+    return ""
+
+def load_explorers(path=None):
+    # Встроенный реестр, дополненный/переопределённый JSON-файлом того же вида:
+    # {"name": {"url": ..., "chainId": ..., "apiKeyEnv": ...}}
+    explorers = {name: dict(entry) for name, entry in EXPLORERS.items()}
+    path = Path(path) if path else EXPLORERS_CONFIG
+    if path.exists():
+        with open(path) as f:
+            for name, entry in json.load(f).items():
+                explorers.setdefault(name, {}).update(entry)
+
+    chain_id = env_setting("REACT_APP_CHAIN_ID")
+    rpc_url = env_setting("REACT_APP_RPC_URL")
+    for name, entry in explorers.items():
+        entry["name"] = name
+        if "apiKeys" not in entry:
+            if entry.get("apiKey"):
+                entry["apiKeys"] = [entry["apiKey"]]
+            else:
+                entry["apiKeys"] = api_keys_from_env(entry.get("apiKeyEnv", ""))
+        if rpc_url and chain_id and str(entry.get("chainId")) == str(chain_id):
+            entry.setdefault("rpcUrl", rpc_url)
+    return explorers
+
+def default_explorer_name(explorers):
+    chain_id = env_setting("REACT_APP_CHAIN_ID")
+    for name, entry in explorers.items():
+        if chain_id and str(entry.get("chainId")) == str(chain_id):
+            return name
+    return DEFAULT_EXPLORER
+
+def select_explorers(explorers, names):
+    if not names:
+        return [explorers[default_explorer_name(explorers)]]
+    if names == "all":
+        return list(explorers.values())
+    selected = []
+    for name in names.split(","):
+        if name not in explorers:
+            raise ValueError(f"Unknown explorer {name}, known: {', '.join(explorers)}")
+        selected.append(explorers[name])
+    return selected
+
+def explorer_client_for(entry, **kwargs):
+    return ExplorerClient(url=entry["url"], api_keys=entry["apiKeys"], name=entry["name"],
+                          rate_limit=entry.get("rateLimit", EXPLORER_RATE_LIMIT), **kwargs)
+
+def verify_on_explorers(deployments, clients, concurrency=DEFAULT_CONCURRENCY, cache=None, checkers=None,
+                        group_rpcs=None):
+    # Один и тот же набор деплоев параллельно на всех эксплорерах, отчёт по каждому отдельно.
+    # Для эксплореров из group_rpcs одинаковый байткод отправляется один раз на группу.
+    deployments = list(deployments)
+
+    def run(client):
+        started = time.monotonic()
+        checker = (checkers or {}).get(client.name)
+        rpc = (group_rpcs or {}).get(client.name)
+        if rpc:
+            jobs = iter_verify_grouped([dict(d) for d in deployments], rpc, concurrency, cache=cache,
+                                       checker=checker, client=client)
+        else:
+            jobs = iter_verify_batch([dict(d) for d in deployments], concurrency, cache=cache,
+                                     checker=checker, client=client)
+        results = [dict(result, explorer=client.name) for result in jobs]
+        return {
+            "explorer": client.name,
+            "url": client.url,
+            "verified": sum(r["status"] in (STATUS_VERIFIED, STATUS_ALREADY_VERIFIED) for r in results),
+            "total": len(results),
+            "elapsed": time.monotonic() - started,
+            "connections": client.connection_stats(),
+            "keys": client.keys.stats(),
+            "resilience": client.resilience_stats(),
+            "results": results,
+        }
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        return {report["explorer"]: report for report in executor.map(run, clients)}
+
+def build_verification_params(deployment):
+    with span("build_payload", address=deployment["address"]) as phase:
+        params = _build_verification_params(deployment)
+        phase.set(payload_bytes=len(params["sourceCode"]), codeformat=params["codeformat"])
+    return params
+
+def _build_verification_params(deployment):
+    if deployment.get("codeFormat") == "standard-json":
+        return build_standard_json_params(deployment)
+    if deployment.get("codeFormat") == "flattened":
+        return build_flattened_params(deployment)
+
+    return {
         "module": "contract",
         "action": "verifysourcecode",
-        "contractaddress": "0xc2697d924fe6cf2eb3dfe4ec6c7bcf2dbfc10966",
-        "sourceCode": contract_code,
+        "contractaddress": deployment["address"],
+        "sourceCode": deployment.get("sourceCode") or get_flattened_contract(),
         "codeformat": "solidity-single-file",
-        "contractname": "Token",
-        "compilerversion": "v0.8.19",
+        "contractname": deployment.get("contractName", "Token"),
+        "compilerversion": deployment.get("compilerVersion", "v0.8.19"),
         "optimizationUsed": "1",
-        "runs": "200",
-        "constructorArguments": "000000000000000000000000000000000000000000000000000000000000004000000000000000000000000000000000000000000000000000000000000000800000000000000000000000000000000000000000000000000000000000000004004D554D550000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000034D554D00000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000186A00000000000000000000000000000000000000000000000000000000000000006000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000A000000000000000000000000000000000000000000000000000000000000000E000000000000000000000000000000000000000000000000000000000000001200000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000186A000000000000000000000000037160534b276b54f21b831663d55f12a5aaf68c8000000000000000000000000000000000000000000000000000000000000000B68747470733A2F2F2E2E2E000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000B68747470733A2F2F2E2E2E000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000F68747470733A2F2F742E6D652F2E2E2E0000000000000000000000000000000000"
+        "runs": str(deployment.get("runs", 200)),
+        "constructorArguments": _constructor_arguments(deployment),
     }
 
-    response = requests.post(url, data=params)
-    result = response.json()
-    
-    print("Initial response:", json.dumps(result, indent=2))
-    
-    if "result" in result:
-        guid = result["result"]
-        print(f"\nGUID получен: {guid}")
-        print("Ожидание верификации...")
-        check_verification_status(guid)
+def build_standard_json_params(deployment):
+    source_name = deployment.get("sourceName", DEFAULT_SOURCE_NAME)
+    contract_name = deployment.get("contractName", "Token")
+    if deployment.get("standardInput"):
+        # Вход и компилятор, подобранные `search`
+        source_code, compiler_version = deployment["standardInput"], deployment["compilerVersion"]
     else:
-        print("Ошибка при отправке запроса на верификации:", result.get("message", "Unknown error"))
+        build_info = load_build_info(deployment.get("buildInfo") or find_build_info(source_name, contract_name))
+        source_code, compiler_version = build_info["inputJson"], "v" + build_info["solcLongVersion"]
+    return {
+        "module": "contract",
+        "action": "verifysourcecode",
+        "contractaddress": deployment["address"],
+        "sourceCode": source_code,
+        "codeformat": "solidity-standard-json-input",
+        "contractname": f"{source_name}:{contract_name}",
+        "compilerversion": compiler_version,
+        "constructorArguments": _constructor_arguments(deployment),
+    }
 
-def check_verification_status(guid):
-    url = "https://api-testnet.bscscan.com/api"
-    
+_IMPORT_RE = re.compile(r'^\s*import\s[^;]*?["\']([^"\']+)["\'][^;]*;[ \t]*\n?', re.M)
+_PRAGMA_RE = re.compile(r'^\s*pragma\s+(solidity|abicoder|experimental)\s[^;]*;[ \t]*\n?', re.M)
+_SPDX_RE = re.compile(r'^\s*//\s*SPDX-License-Identifier:\s*(.+?)\s*$', re.M)
+
+@functools.lru_cache(maxsize=None)
+def load_solidity_files_cache(path=SOLIDITY_FILES_CACHE):
+    try:
+        with open(path) as f:
+            files = json.load(f)["files"]
+    except FileNotFoundError:
+        return {}
+    return {entry["sourceName"]: entry for entry in files.values()}
+
+def resolve_import(importer, path):
+    if path.startswith("."):
+        return posixpath.normpath(posixpath.join(posixpath.dirname(importer), path))
+    return path
+
+class Flattener:
+    # Склеивает исходник со всеми импортами в один файл. Хэши содержимого берутся из
+    # cache/solidity-files-cache.json, граф импортов и готовые результаты хранятся на диске:
+    # пока contentHash файлов не меняется, повторное склеивание - одно чтение готового файла.
+    def __init__(self, root=ROOT_DIR, state_path=FLATTEN_STATE_PATH):
+        self.root = Path(root)
+        self.state_path = Path(state_path)
+        self.output_dir = self.state_path.parent / "flattened"
+        self._lock = threading.Lock()
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {"files": {}, "outputs": {}}
+
+    def read_source(self, source_name):
+        for path in (self.root / source_name, self.root / "node_modules" / source_name):
+            if path.exists():
+                return path.read_text(encoding="utf-8")
+        # node_modules может не быть: исходники зависимостей есть в input build-info
+        sources = load_build_info(find_build_info())["input"]["sources"]
+        if source_name in sources:
+            return sources[source_name]["content"]
+        raise FileNotFoundError(source_name)
+
+    def content_hash(self, source_name):
+        entry = load_solidity_files_cache().get(source_name)
+        if entry:
+            return entry["contentHash"]
+        return hashlib.md5(self.read_source(source_name).encode("utf-8")).hexdigest()
+
+    def _imports(self, source_name, content_hash):
+        memo = self.state["files"].get(source_name)
+        if memo and memo["contentHash"] == content_hash:
+            return memo["imports"]
+        content = self.read_source(source_name)
+        imports = [resolve_import(source_name, path) for path in _IMPORT_RE.findall(content)]
+        self.state["files"][source_name] = {"contentHash": content_hash, "imports": imports}
+        return imports
+
+    def _closure(self, source_name):
+        # Порядок обхода в глубину с выводом после зависимостей - зависимости идут раньше
+        order = []
+        hashes = {}
+
+        def visit(name):
+            if name in hashes:
+                return
+            hashes[name] = self.content_hash(name)
+            for dependency in self._imports(name, hashes[name]):
+                visit(dependency)
+            order.append(name)
+
+        visit(source_name)
+        return order, hashes
+
+    def flatten(self, source_name):
+        with self._lock:
+            order, hashes = self._closure(source_name)
+            output = self.state["outputs"].get(source_name)
+            output_file = self.output_dir / (source_name.replace("/", "__"))
+            if output and output["hashes"] == hashes and output_file.exists():
+                return output_file.read_text(encoding="utf-8")
+
+            text = self._concatenate(order)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            output_file.write_text(text, encoding="utf-8")
+            self.state["outputs"][source_name] = {"hashes": hashes}
+            self._save_state()
+            return text
+
+    def _concatenate(self, order):
+        licenses = []
+        pragmas = []
+        bodies = []
+        for name in order:
+            content = self.read_source(name)
+            for license_id in _SPDX_RE.findall(content):
+                for part in re.split(r"\s+AND\s+", license_id):
+                    if part not in licenses:
+                        licenses.append(part)
+            for match in _PRAGMA_RE.finditer(content):
+                pragma = " ".join(match.group(0).split())
+                if pragma not in pragmas:
+                    pragmas.append(pragma)
+            body = _IMPORT_RE.sub("", _PRAGMA_RE.sub("", _SPDX_RE.sub("", content)))
+            bodies.append(f"// File {name}\n\n{body.strip()}\n")
+
+        header = f"// SPDX-License-Identifier: {' AND '.join(licenses) or 'UNLICENSED'}\n\n"
+        header += "\n".join(pragmas) + "\n\n"
+        return header + "\n".join(bodies)
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+@functools.lru_cache(maxsize=None)
+def get_flattener():
+    return Flattener()
+
+def build_flattened_params(deployment):
+    source_name = deployment.get("sourceName", DEFAULT_SOURCE_NAME)
+    contract_name = deployment.get("contractName", "Token")
+    source = get_flattener().flatten(source_name)
+    build_info = load_build_info(deployment.get("buildInfo") or find_build_info(source_name, contract_name))
+    settings = build_info["input"]["settings"]
     params = {
-        "apikey": "A12FVH4CZCY6B7C98VJRDWSK7U4Y5UI2X4",
         "module": "contract",
-        "action": "checkverifystatus",
-        "guid": guid
+        "action": "verifysourcecode",
+        "contractaddress": deployment["address"],
+        "compilerversion": "v" + build_info["solcLongVersion"],
+        "constructorArguments": _constructor_arguments(deployment),
     }
+
+    if settings.get("viaIR"):
+        # У solidity-single-file нет параметра viaIR, поэтому склеенный файл уходит как standard-json
+        params.update({
+            "sourceCode": json.dumps({
+                "language": "Solidity",
+                "sources": {source_name: {"content": source}},
+                "settings": {k: v for k, v in settings.items() if k != "outputSelection"},
+            }, separators=(",", ":")),
+            "codeformat": "solidity-standard-json-input",
+            "contractname": f"{source_name}:{contract_name}",
+        })
+    else:
+        optimizer = settings.get("optimizer", {})
+        params.update({
+            "sourceCode": source,
+            "codeformat": "solidity-single-file",
+            "contractname": contract_name,
+            "optimizationUsed": "1" if optimizer.get("enabled") else "0",
+            "runs": str(optimizer.get("runs", 200)),
+        })
+    return params
+
+def submit_verification(params, client=None):
+    client = client or get_explorer_client()
+    with span("submit", explorer=client.name, address=params["contractaddress"],
+              payload_bytes=len(params["sourceCode"])) as phase:
+        result = client.submit_verification(params)
+        phase.set(status=STATUS_PENDING if result.get("status") == "1" else classify_status(result))
+    return result
+
+def fetch_verification_status(guid, client=None):
+    client = client or get_explorer_client()
+    with span("poll", explorer=client.name, guid=guid) as phase:
+        result = client.check_verification_status(guid)
+        phase.set(status=classify_status(result))
+    return result
+
+class StatusPoller:
+    # Опрашивает checkverifystatus для многих GUID сразу. Интервалы подстраиваются под
+    # наблюдаемое время в очереди эксплорера: редко до ожидаемого момента, часто около него
+    # и с экспоненциальной задержкой после.
+    def __init__(self, fetch=None, on_result=None, on_poll=None, workers=4,
+                 min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 timeout=POLL_TIMEOUT, queue_time=EXPECTED_QUEUE_TIME):
+        self.fetch = fetch or fetch_verification_status
+        self.on_result = on_result
+        self.on_poll = on_poll
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.queue_time = queue_time
+        self._jobs = {}
+        self._schedule = []
+        self._ready = []
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def add(self, guid, context=None, submitted_at=None):
+        now = time.monotonic()
+        job = {
+            "guid": guid,
+            "context": context,
+            "submitted_at": submitted_at or now,
+            "attempts": 0,
+            "overdue": 0,
+        }
+        with self._cond:
+            self._jobs[guid] = job
+            self._reschedule(job, now)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def results(self):
+        # Опросы идут в пуле независимо друг от друга, итоги отдаются по мере готовности:
+        # один медленный ответ эксплорера не задерживает остальные
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                due, ready = self._wait_due()
+                if due is None:
+                    return
+                for job in due:
+                    executor.submit(self._poll, job)
+                for result in ready:
+                    if self.on_result:
+                        self.on_result(result)
+                    yield result
+
+    def run(self):
+        for _ in self.results():
+            pass
+
+    def _next_delay(self, job, now):
+        elapsed = now - job["submitted_at"]
+        if job["attempts"] == 0:
+            # Короткая первая проверка: на быстрой очереди задача готова раньше ожидаемого времени
+            delay = max(0.0, POLL_FIRST_DELAY - elapsed)
+        elif elapsed < self.queue_time:
+            delay = max(self.min_interval, (self.queue_time - elapsed) / 2)
+        else:
+            delay = min(self.max_interval, self.min_interval * 2 ** job["overdue"])
+            job["overdue"] += 1
+        return delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    def _reschedule(self, job, now):
+        job["next_poll"] = now + self._next_delay(job, now)
+        heapq.heappush(self._schedule, (job["next_poll"], job["guid"]))
+
+    def _wait_due(self):
+        # (задачи к опросу, готовые итоги) или (None, []), когда задач больше не будет
+        with self._cond:
+            while True:
+                ready, self._ready = self._ready, []
+                if not self._jobs and not ready:
+                    if self._closed:
+                        return None, []
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                due = []
+                while self._schedule and self._schedule[0][0] <= now:
+                    _, guid = heapq.heappop(self._schedule)
+                    job = self._jobs.get(guid)
+                    if job is not None and job["next_poll"] <= now:
+                        due.append(job)
+                if due or ready:
+                    return due, ready
+                # Пустое расписание - все задачи сейчас опрашиваются, ждём их итогов
+                self._cond.wait(self._schedule[0][0] - now if self._schedule else None)
+
+    def _poll(self, job):
+        job["attempts"] += 1
+        try:
+            response = self.fetch(job["guid"])
+        except TransientExplorerError as e:
+            response = {"status": "0", "result": STATUS_ERROR, "error": str(e)}
+            status = STATUS_PENDING
+        except Exception as e:
+            # Постоянная ошибка (4xx, неверный ключ, открытая цепь, исчерпанные повторы) - опрос прекращается
+            response = {"status": "0", "result": str(e)}
+            status = STATUS_ERROR
+        else:
+            status = classify_status(response)
+
+        try:
+            if self.on_poll:
+                self.on_poll(job, response)
+        except Exception as e:
+            response = {"status": "0", "result": str(e)}
+            status = STATUS_ERROR
+
+        now = time.monotonic()
+        elapsed = now - job["submitted_at"]
+        if status in (STATUS_PENDING, STATUS_THROTTLED) and elapsed < self.timeout:
+            with self._cond:
+                self._reschedule(job, now)
+                self._cond.notify()
+            return
+
+        if status in (STATUS_VERIFIED, STATUS_FAILED):
+            self.queue_time = 0.7 * self.queue_time + 0.3 * elapsed
+
+        result = {
+            "guid": job["guid"],
+            "context": job["context"],
+            "status": STATUS_TIMEOUT if status in (STATUS_PENDING, STATUS_THROTTLED) else status,
+            "result": response.get("result"),
+            "attempts": job["attempts"],
+            "elapsed": elapsed,
+        }
+        # Снятие задачи и публикация итога под одной блокировкой: results() не завершится раньше
+        with self._cond:
+            self._jobs.pop(job["guid"], None)
+            self._ready.append(result)
+            self._cond.notify()
+
+def verify_contract(address=DEFAULT_CONTRACT_ADDRESS, constructor_arguments=DEFAULT_CONSTRUCTOR_ARGUMENTS, cache=None):
+    started = time.monotonic()
+    params = build_verification_params({
+        "address": address,
+        "constructorArguments": constructor_arguments,
+    })
+    key = VerificationCache.key(params, get_explorer_client().url)
+
+    cached = cache.get(key) if cache else None
+    if cached and cached["status"] != STATUS_PENDING:
+        print("Результат из кэша:", cached["status"], cached["result"])
+        record_job(dict(cached, attempts=0, cached=True, elapsed=time.monotonic() - started))
+        return cached
+
+    if cached:
+        guid = cached["guid"]
+        print(f"GUID из кэша: {guid}")
+    else:
+        try:
+            result = submit_verification(params)
+        except ExplorerError as e:
+            print("Эксплорер недоступен:", e)
+            record_job({"address": address, "status": STATUS_ERROR, "attempts": 0, "elapsed": time.monotonic() - started})
+            return None
     
-    max_attempts = 10
-    attempt = 0
+        print("Initial response:", json.dumps(result, indent=2))
     
-    while attempt < max_attempts:
-        response = requests.get(url, params=params)
-        result = response.json()
-        
-        print(f"Попытка {attempt + 1}: {result['result']}")
-        
-        if "Pending in queue" not in result["result"]:
-            print("\nФинальный статус:", result["result"])
+        if result.get("status") != "1":
+            print("Ошибка при отправке запроса на верификации:", result.get("result") or result.get("message", "Unknown error"))
+            status = classify_status(result)
+            if cache and status != STATUS_THROTTLED:
+                cache.put(key, address, STATUS_FAILED if status == STATUS_PENDING else status, result=result.get("result"))
+            record_job({"address": address, "status": status, "attempts": 0, "elapsed": time.monotonic() - started})
+            return None
+
+        guid = result["result"]
+        print(f"\nGUID получен: {guid}")
+        if cache:
+            cache.put(key, address, STATUS_PENDING, guid=guid)
+
+    print("Ожидание верификации...")
+    final = check_verification_status(guid)
+    if cache and final:
+        cache.put(key, address, final["status"], guid=guid, result=final["result"])
+    if final:
+        record_job(dict(final, address=address, elapsed=time.monotonic() - started))
+    return final
+
+def check_verification_status(guid):
+    poller = StatusPoller(
+        workers=1,
+        on_poll=lambda job, result: print(f"Попытка {job['attempts']}: {result['result']}"),
+    )
+    poller.add(guid)
+    poller.close()
+
+    for result in poller.results():
+        print("\nФинальный статус:", result["result"])
+        return result
+
+class SourceCache:
+    # Ответы getsourcecode по (эксплорер, адрес). Верифицированный исходник не меняется и хранится
+    # бессрочно, отрицательный ответ - negative_ttl секунд: контракт могут верифицировать позже.
+    def __init__(self, path=SOURCE_CACHE_PATH, negative_ttl=SOURCE_NEGATIVE_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sources (
+                explorer TEXT NOT NULL,
+                address TEXT NOT NULL,
+                verified INTEGER NOT NULL,
+                source TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (explorer, address)
+            )
+        """)
+        self._db.commit()
+
+    def get_many(self, explorer, addresses):
+        found = {}
+        stale = time.time() - self.negative_ttl
+        with self._lock:
+            for i in range(0, len(addresses), 500):
+                part = addresses[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT address, verified, source, updated_at FROM sources "
+                    f"WHERE explorer = ? AND address IN ({','.join('?' * len(part))})", [explorer, *part]
+                ).fetchall()
+                for address, verified, source, updated_at in rows:
+                    if verified or updated_at >= stale:
+                        found[address] = (bool(verified), json.loads(source) if source else None, updated_at)
+        return found
+
+    def put_many(self, explorer, entries):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sources (explorer, address, verified, source, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(explorer, address, int(verified), json.dumps(source) if source else None, now)
+                 for address, (verified, source) in entries.items()],
+            )
+            self._db.commit()
+
+    def invalidate(self, explorer, address):
+        with self._lock:
+            self._db.execute("DELETE FROM sources WHERE explorer = ? AND address = ?", (explorer, address.lower()))
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+class ExplorerReader:
+    # Чтение getsourcecode через два уровня кэша: LRU в процессе и SourceCache на диске.
+    # ABI берётся из того же ответа getsourcecode, отдельный getabi не нужен. Промахи пачки
+    # запрашиваются параллельно через ExplorerClient, то есть через общий лимит API-ключей.
+    def __init__(self, client, cache=None, memory_size=SOURCE_MEMORY_SIZE, workers=SOURCE_LOOKUP_WORKERS):
+        self.client = client
+        self.cache = cache
+        self.memory_size = memory_size
+        self.workers = workers
+        self.negative_ttl = cache.negative_ttl if cache else SOURCE_NEGATIVE_TTL
+        self.stats = {"memory": 0, "disk": 0, "fetched": 0}
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, address, verified, source, updated_at):
+        with self._lock:
+            self._memory[address] = (verified, source, updated_at)
+            self._memory.move_to_end(address)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, address):
+        with self._lock:
+            entry = self._memory.get(address)
+            if entry is None:
+                return None
+            if not entry[0] and time.time() - entry[2] > self.negative_ttl:
+                del self._memory[address]
+                return None
+            self._memory.move_to_end(address)
+            return entry
+
+    def _fetch(self, address):
+        try:
+            source = self.client.get_source_code(address)
+        except ExplorerError as e:
+            return e
+        verified = bool(source.get("SourceCode"))
+        return verified, source if verified else None
+
+    def sources(self, addresses, refresh=False):
+        # {address: getsourcecode-запись или None, если исходник не верифицирован}
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        found = {}
+        missing = []
+        for address in addresses:
+            entry = None if refresh else self._from_memory(address)
+            if entry is None:
+                missing.append(address)
+            else:
+                found[address] = entry
+                self.stats["memory"] += 1
+
+        if self.cache and missing and not refresh:
+            for address, entry in self.cache.get_many(self.client.url, missing).items():
+                found[address] = entry
+                self._remember(address, *entry)
+                self.stats["disk"] += 1
+            missing = [address for address in missing if address not in found]
+
+        if missing:
+            with span("lookup_sources", explorer=self.client.name, addresses=len(missing)), \
+                    ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as executor:
+                fetched = dict(zip(missing, executor.map(self._fetch, missing)))
+            errors = {address: e for address, e in fetched.items() if isinstance(e, ExplorerError)}
+            fetched = {address: entry for address, entry in fetched.items() if address not in errors}
+            if self.cache:
+                self.cache.put_many(self.client.url, fetched)
+            now = time.time()
+            for address, (verified, source) in fetched.items():
+                found[address] = (verified, source, now)
+                self._remember(address, verified, source, now)
+            self.stats["fetched"] += len(fetched)
+            # Удачные ответы уже в кэше, повторный вызов спросит только адреса с ошибкой
+            if errors:
+                raise ExplorerError(f"{len(errors)} of {len(addresses)} lookups failed, e.g. "
+                                    f"{next(iter(errors.values()))}")
+
+        return {address: found[address][1] for address in addresses}
+
+    def source(self, address):
+        return self.sources([address])[address.lower()]
+
+    def is_verified(self, address):
+        return self.source(address) is not None
+
+    def abi(self, address):
+        source = self.source(address)
+        return json.loads(source["ABI"]) if source else None
+
+@functools.lru_cache(maxsize=None)
+def get_explorer_reader(client):
+    return ExplorerReader(client, SourceCache())
+
+def submit_deployment(deployment, cache=None, client=None):
+    client = client or get_explorer_client()
+    started = time.monotonic()
+    params = build_verification_params(deployment)
+    key = VerificationCache.key(params, client.url)
+
+    cached = cache.get(key) if cache else None
+    if cached:
+        return {
+            "address": deployment["address"],
+            "guid": cached["guid"],
+            "status": cached["status"],
+            "result": cached["result"],
+            "attempts": 0,
+            "cached": True,
+            "key": key,
+            "submitted_at": started,
+        }
+
+    result = submit_verification(params, client)
+
+    if result.get("status") == "1":
+        status = STATUS_PENDING
+    else:
+        status = classify_status(result)
+        if status == STATUS_PENDING:
+            status = STATUS_FAILED
+
+    return {
+        "address": deployment["address"],
+        "guid": result["result"] if status == STATUS_PENDING else None,
+        "status": status,
+        "result": result.get("result") or result.get("message", "Unknown error"),
+        "attempts": 0,
+        "key": key,
+        "submitted_at": started,
+    }
+
+def _store_job(store, job):
+    # Переносит итог задачи в JobStore. Временные ошибки возвращают задачу в очередь:
+    # с GUID - на дальнейший опрос, без него - на повторную отправку.
+    if job["status"] in (STATUS_VERIFIED, STATUS_ALREADY_VERIFIED):
+        state, retry_after = JOB_VERIFIED, None
+    elif job["status"] == STATUS_FAILED:
+        state, retry_after = JOB_FAILED, None
+    elif job["status"] == STATUS_PENDING:
+        state, retry_after = JOB_SUBMITTED, None
+    else:
+        state = JOB_POLLING if job.get("guid") else JOB_PENDING_SUBMIT
+        retry_after = JOB_RETRY_DELAY
+    store.update(job["jobId"], state, guid=job.get("guid"), status=job["status"], result=job.get("result"),
+                 attempts=job.get("attempts"), retry_after=retry_after)
+
+def iter_verify_batch(deployments, concurrency=DEFAULT_CONCURRENCY, max_pending=None, cache=None, checker=None,
+                      client=None, store=None):
+    # Отправка идёт в пуле из concurrency потоков, опрос всех GUID - в одном StatusPoller.
+    # Входной итератор читается лениво: одновременно в работе не больше max_pending задач.
+    # Со store деплои - задачи из JobStore: уже отправленные (с guid) сразу идут на опрос.
+    slots = threading.BoundedSemaphore(max_pending or concurrency * 16)
+    finished = queue.Queue()
+    client = client or get_explorer_client()
+
+    def on_poll(job, response):
+        if store and job["attempts"] == 1:
+            store.update(job["context"]["jobId"], JOB_POLLING)
+
+    poller = StatusPoller(fetch=lambda guid: fetch_verification_status(guid, client), on_poll=on_poll)
+    errors = []
+
+    def submit(deployment):
+        # Каждый деплой даёт ровно одну строку результата: иначе не освободится его слот,
+        # и после max_pending таких сбоев feed() зависнет на slots.acquire()
+        try:
+            _submit(deployment)
+        except Exception as e:
+            row = deployment if isinstance(deployment, dict) else {"address": deployment}
+            finished.put({"address": row.get("address"), "line": row.get("line"), "guid": None,
+                          "status": STATUS_ERROR, "result": str(e), "attempts": 0})
+
+    def _submit(deployment):
+        if store and deployment.get("guid"):
+            job = {"address": deployment["address"], "guid": deployment["guid"], "status": STATUS_PENDING,
+                   "result": None, "attempts": 0, "resumed": True, "submitted_at": time.monotonic()}
+        else:
+            try:
+                mismatch = checker.check(deployment) if checker else None
+                if mismatch:
+                    job = {"address": deployment["address"], "guid": None, "status": STATUS_FAILED,
+                           "result": mismatch, "attempts": 0, "precheck": True}
+                else:
+                    job = submit_deployment(deployment, cache, client)
+            except Exception as e:
+                job = {"address": deployment.get("address"), "guid": None, "status": STATUS_ERROR,
+                       "result": str(e), "attempts": 0}
+        # Строка манифеста: по ней результат сопоставляется с входом, в том числе при --resume
+        if deployment.get("line") is not None:
+            job["line"] = deployment["line"]
+        if cache and "key" in job and not job.get("cached") and job["status"] != STATUS_THROTTLED:
+            cache.put(job["key"], job["address"], job["status"], guid=job["guid"], result=job["result"])
+        if store:
+            job["jobId"] = deployment["jobId"]
+            if not job.get("resumed"):
+                _store_job(store, job)
+        if job["status"] == STATUS_PENDING:
+            poller.add(job["guid"], job, job["submitted_at"])
+        else:
+            finished.put(job)
+
+    def on_done(future):
+        if future.exception() is not None:
+            errors.append(future.exception())
+
+    def feed():
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for deployment in deployments:
+                    slots.acquire()
+                    executor.submit(submit, deployment).add_done_callback(on_done)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            poller.close()
+
+    def poll():
+        for result in poller.results():
+            job = result["context"]
+            job.update(status=result["status"], result=result["result"], attempts=result["attempts"])
+            if cache and "key" in job:
+                cache.put(job["key"], job["address"], job["status"], guid=job["guid"], result=job["result"])
+            if store:
+                _store_job(store, job)
+            finished.put(job)
+        finished.put(None)
+
+    threading.Thread(target=feed, daemon=True).start()
+    threading.Thread(target=poll, daemon=True).start()
+
+    while True:
+        job = finished.get()
+        if job is None:
             break
-            
-        attempt += 1
-        time.sleep(10)
+        slots.release()
+        job.pop("key", None)
+        job.pop("jobId", None)
+        submitted_at = job.pop("submitted_at", None)
+        job["elapsed"] = time.monotonic() - submitted_at if submitted_at else None
+        record_job(job)
+        yield job
+
+    if errors:
+        raise errors[0]
+
+def verify_batch(deployments, concurrency=DEFAULT_CONCURRENCY, cache=None, checker=None):
+    results = iter_verify_batch(deployments, concurrency, cache=cache, checker=checker)
+    return {result["address"]: result for result in results}
+
+def drain_job_store(store, client=None, owner=None, concurrency=DEFAULT_CONCURRENCY, cache=None, checker=None):
+    # Забирает задачи эксплорера из JobStore пачками, пока есть свободные, и продлевает
+    # аренду на время опроса. Задачи, отложенные с retry_after, достанутся следующему запуску.
+    client = client or get_explorer_client()
+    owner = owner or default_worker_id()
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(store.lease_seconds / 3):
+            store.renew(owner)
+
+    def leased():
+        while True:
+            jobs = store.lease(owner, client.name)
+            if not jobs:
+                return
+            yield from jobs
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        yield from iter_verify_batch(leased(), concurrency, cache=cache, checker=checker, client=client, store=store)
+    finally:
+        stop.set()
+        store.release(owner)
+
+@functools.lru_cache(maxsize=None)
+def read_env_file(path=ENV_FILE):
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    values[key.strip()] = value.strip().strip('"').strip("'")
+    except FileNotFoundError:
+        pass
+    return values
+
+def env_setting(name, default=None):
+    return os.environ.get(name) or read_env_file().get(name) or default
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.message = message
+
+class RpcClient:
+    def __init__(self, url, timeout=RPC_TIMEOUT, pool_size=EXPLORER_POOL_SIZE):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._ids = itertools.count(1)
+
+    def call(self, method, *params):
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        data = response.json()
+        if "error" in data:
+            raise RpcError(data["error"].get("code"), data["error"].get("message", ""))
+        return data["result"]
+
+    def batch(self, calls):
+        # Один HTTP-запрос на список (method, params); ответы раскладываются по id в исходном порядке,
+        # ошибка отдельного вызова возвращается экземпляром RpcError на его месте
+        if not calls:
+            return []
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": call_id, "method": method, "params": list(params)}
+            for call_id, (method, params) in zip(ids, calls)
+        ]
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        data = response.json()
+        if isinstance(data, dict):
+            error = data.get("error") or {}
+            raise RpcError(error.get("code"), error.get("message", "Batch request rejected"))
+
+        by_id = {item.get("id"): item for item in data}
+        results = []
+        for call_id in ids:
+            item = by_id.get(call_id)
+            if item is None:
+                results.append(RpcError(None, "No response in batch"))
+            elif "error" in item:
+                results.append(RpcError(item["error"].get("code"), item["error"].get("message", "")))
+            else:
+                results.append(item["result"])
+        return results
+
+    def block_number(self):
+        return int(self.call("eth_blockNumber"), 16)
+
+    def eth_call(self, to, data, block="latest"):
+        return self.call("eth_call", {"to": to, "data": data}, block)
+
+    def get_code(self, address, block="latest"):
+        return self.call("eth_getCode", address, block)
+
+    def get_logs(self, address, topics, from_block, to_block):
+        return self.call("eth_getLogs", {
+            "address": address,
+            "topics": topics,
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+        })
+
+_RANGE_ERROR_MESSAGES = (
+    "block range",
+    "range is too large",
+    "range too large",
+    "query returned more than",
+    "limit exceeded",
+    "too many",
+    "response size",
+    "exceed maximum",
+)
+
+def is_range_error(error):
+    if isinstance(error, requests.Timeout):
+        return True
+    if isinstance(error, RpcError):
+        message = error.message.lower()
+        return error.code == -32005 or any(text in message for text in _RANGE_ERROR_MESSAGES)
+    return False
+
+def _topic_address(topic):
+    return "0x" + topic[-40:]
+
+def iter_log_chunks(rpc, address, topics, from_block, to_block, chunk=LOG_CHUNK_INITIAL):
+    # eth_getLogs кусками блоков: (логи, последний блок куска, размер следующего куска).
+    # Кусок уменьшается вдвое при ошибке диапазона от провайдера и растёт, пока логов мало.
+    ceiling = LOG_CHUNK_MAX
+    while from_block <= to_block:
+        end = min(from_block + chunk - 1, to_block)
+        try:
+            logs = rpc.get_logs(address, topics, from_block, end)
+        except (RpcError, requests.RequestException) as e:
+            if not is_range_error(e) or chunk == 1:
+                raise
+            ceiling = max(1, chunk // 2)
+            chunk = ceiling
+            continue
+
+        if len(logs) < LOG_SPARSE_THRESHOLD:
+            chunk = min(ceiling, chunk * 2)
+        yield logs, end, chunk
+        from_block = end + 1
+
+def block_timestamps(rpc, blocks, batch_size=100):
+    blocks = sorted(set(blocks))
+    timestamps = {}
+    for i in range(0, len(blocks), batch_size):
+        part = blocks[i:i + batch_size]
+        for number, block in zip(part, rpc.batch([("eth_getBlockByNumber", (hex(n), False)) for n in part])):
+            if isinstance(block, RpcError):
+                raise block
+            timestamps[number] = int(block["timestamp"], 16)
+    return timestamps
+
+class TokenCreatedIndexer:
+    # Сканирует TokenCreated фабрики через iter_log_chunks. Последний просканированный блок и размер
+    # куска сохраняются в чекпоинт, так что следующий запуск читает только новые блоки.
+    def __init__(self, rpc, factory, checkpoint_path=INDEX_CHECKPOINT_PATH, start_block=0, confirmations=0):
+        self.rpc = rpc
+        self.factory = factory.lower()
+        self.checkpoint_path = Path(checkpoint_path)
+        self.start_block = start_block
+        self.confirmations = confirmations
+
+    def _load_checkpoints(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def checkpoint(self):
+        return self._load_checkpoints().get(self.factory, {})
+
+    def _save_checkpoint(self, last_block, chunk_size):
+        checkpoints = self._load_checkpoints()
+        checkpoints[self.factory] = {"lastBlock": last_block, "chunkSize": chunk_size}
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+        os.replace(tmp, self.checkpoint_path)
+
+    def scan(self):
+        checkpoint = self.checkpoint()
+        from_block = max(checkpoint.get("lastBlock", self.start_block - 1) + 1, self.start_block)
+        chunk = checkpoint.get("chunkSize", LOG_CHUNK_INITIAL)
+        head = self.rpc.block_number() - self.confirmations
+
+        for logs, to_block, chunk in iter_log_chunks(self.rpc, self.factory, [TOKEN_CREATED_TOPIC],
+                                                     from_block, head, chunk):
+            for log in logs:
+                if log.get("removed"):
+                    continue
+                yield {
+                    "address": _topic_address(log["topics"][1]),
+                    "creator": _topic_address(log["topics"][2]),
+                    "blockNumber": int(log["blockNumber"], 16),
+                    "transactionHash": log["transactionHash"],
+                }
+            self._save_checkpoint(to_block, chunk)
+
+def strip_metadata(code):
+    # Последние два байта - длина CBOR-метаданных (ipfs/solc), сами метаданные идут перед ними
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], "big")
+    if length + 2 <= len(code) and 0xa0 <= code[-length - 2] <= 0xbf:
+        return code[:-length - 2]
+    return code
+
+def normalize_runtime_code(code, immutables=()):
+    if immutables:
+        code = bytearray(code)
+        for start, length in immutables:
+            code[start:start + length] = bytes(length)
+        code = bytes(code)
+    return strip_metadata(code)
+
+@functools.lru_cache(maxsize=None)
+def load_immutable_references(build_info_path):
+    # Нужен полный output build-info, поэтому читается один раз на файл и только для проверки байткода
+    with open(build_info_path, encoding="utf-8") as f:
+        output = json.load(f)["output"]
+    references = {}
+    for source_name, contracts in output.get("contracts", {}).items():
+        for contract_name, contract in contracts.items():
+            refs = contract.get("evm", {}).get("deployedBytecode", {}).get("immutableReferences", {})
+            references[f"{source_name}:{contract_name}"] = tuple(sorted(
+                (ref["start"], ref["length"]) for refs_list in refs.values() for ref in refs_list
+            ))
+    return references
+
+class BytecodeIndex:
+    # sha256 нормализованного runtime-байткода всех артефактов, сгруппированный по маске immutables:
+    # для неизвестного адреса достаточно одного хэша на каждую различную маску
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR / "contracts"):
+        self.contracts = {}
+        self._by_mask = {}
+        for path in sorted(Path(artifacts_dir).rglob("*.json")):
+            if path.name.endswith(".dbg.json"):
+                continue
+            with open(path) as f:
+                artifact = json.load(f)
+            code = bytes.fromhex(artifact.get("deployedBytecode", "0x")[2:])
+            if not code:
+                continue
+
+            name = f"{artifact['sourceName']}:{artifact['contractName']}"
+            debug_file = path.with_name(path.stem + ".dbg.json")
+            immutables = ()
+            if debug_file.exists():
+                with open(debug_file) as f:
+                    build_info = str((debug_file.parent / json.load(f)["buildInfo"]).resolve())
+                immutables = load_immutable_references(build_info).get(name, ())
+
+            digest = hashlib.sha256(normalize_runtime_code(code, immutables)).hexdigest()
+            self.contracts[name] = {
+                "sourceName": artifact["sourceName"],
+                "contractName": artifact["contractName"],
+                "immutables": immutables,
+                "hash": digest,
+            }
+            self._by_mask.setdefault(immutables, {})[digest] = name
+
+    def identify(self, runtime_code):
+        for immutables, hashes in self._by_mask.items():
+            name = hashes.get(hashlib.sha256(normalize_runtime_code(runtime_code, immutables)).hexdigest())
+            if name:
+                return name
+        return None
+
+    def matches(self, name, runtime_code):
+        contract = self.contracts[name]
+        digest = hashlib.sha256(normalize_runtime_code(runtime_code, contract["immutables"])).hexdigest()
+        return digest == contract["hash"]
+
+    def group_key(self, runtime_code):
+        # Код известного артефакта группируется по артефакту (immutables у каждого токена свои),
+        # остальной - по хэшу без метаданных
+        name = self.identify(runtime_code)
+        if name:
+            return name
+        return hashlib.sha256(strip_metadata(runtime_code)).hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def get_bytecode_index():
+    return BytecodeIndex()
+
+class BytecodeChecker:
+    # Предварительная проверка перед отправкой: код по адресу должен совпадать с артефактом,
+    # иначе эксплорер всё равно ответит Fail после очереди и опроса
+    def __init__(self, rpc, index=None):
+        self.rpc = rpc
+        self.index = index or get_bytecode_index()
+        self._warned = False
+
+    def check(self, deployment):
+        # standard-json и flattened собираются из тех же исходников, что и артефакты. Встроенный
+        # single-file исходник к артефактам отношения не имеет - сравнивать не с чем.
+        if deployment.get("codeFormat") not in ("standard-json", "flattened"):
+            if not self._warned:
+                self._warned = True
+                print("Warning: --precheck only applies to --standard-json and --flattened deployments, "
+                      "single-file deployments are submitted unchecked", file=sys.stderr)
+            return None
+
+        code = bytes.fromhex(self.rpc.get_code(deployment["address"])[2:])
+        if not code:
+            return "No contract code at address"
+
+        if deployment.get("contractName"):
+            name = f"{deployment.get('sourceName', DEFAULT_SOURCE_NAME)}:{deployment['contractName']}"
+            if name not in self.index.contracts:
+                return f"No artifact for {name}"
+            if not self.index.matches(name, code):
+                return f"Deployed bytecode does not match {name}"
+            return None
+
+        name = self.index.identify(code)
+        if name is None:
+            return "Deployed bytecode does not match any artifact"
+        deployment["sourceName"] = self.index.contracts[name]["sourceName"]
+        deployment["contractName"] = self.index.contracts[name]["contractName"]
+        return None
+
+class CompilerError(Exception):
+    pass
+
+def solc_platform():
+    if sys.platform.startswith("linux"):
+        return "linux-amd64"
+    if sys.platform == "darwin":
+        return "macosx-amd64"
+    if sys.platform.startswith("win"):
+        return "windows-amd64"
+    raise CompilerError(f"No solc builds for {sys.platform}")
+
+@functools.lru_cache(maxsize=None)
+def solc_builds(platform):
+    path = SOLC_CACHE_DIR / platform / "list.json"
+    try:
+        response = requests.get(f"{SOLC_BINARIES_URL}/{platform}/list.json", timeout=RPC_TIMEOUT)
+        response.raise_for_status()
+        builds = response.json()
+    except requests.RequestException:
+        if not path.exists():
+            raise
+        with open(path) as f:
+            return json.load(f)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"list.json.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(builds, f)
+    os.replace(tmp, path)
+    return builds
+
+def solc_binary(version):
+    # version - "0.8.19", "v0.8.19" или полная "0.8.19+commit.7dd6d404". Сначала ищется уже
+    # скачанный бинарник (свой кэш, затем кэш Hardhat), и только потом list.json и загрузка.
+    version = version.lstrip("v")
+    platform = solc_platform()
+    pattern = f"solc-{platform}-v{version}" + ("" if "+" in version else "+commit.*")
+    for directory in (SOLC_CACHE_DIR / platform, *(path / platform for path in HARDHAT_COMPILERS_DIRS)):
+        for path in sorted(directory.glob(pattern)) + sorted(directory.glob(pattern + ".exe")):
+            return path
+
+    builds = solc_builds(platform)
+    long_version = version if "+" in version else None
+    if long_version is None:
+        release = builds["releases"].get(version)
+        if release is None:
+            raise CompilerError(f"Unknown solc version {version}")
+        long_version = release.split("-v", 1)[1].removesuffix(".exe")
+    build = next((b for b in builds["builds"] if b["longVersion"] == long_version), None)
+    if build is None:
+        raise CompilerError(f"Unknown solc version {version}")
+
+    path = SOLC_CACHE_DIR / platform / build["path"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with span("download_solc", version=long_version):
+        response = requests.get(f"{SOLC_BINARIES_URL}/{platform}/{build['path']}", timeout=SOLC_TIMEOUT)
+        response.raise_for_status()
+    if "0x" + hashlib.sha256(response.content).hexdigest() != build["sha256"]:
+        raise CompilerError(f"Checksum mismatch for {build['path']}")
+    # Несколько процессов могут качать один и тот же компилятор: пишем во временный файл
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(response.content)
+    os.chmod(tmp, 0o755)
+    os.replace(tmp, path)
+    return path
+
+def single_file_input(source, runs=200, via_ir=False, optimize=True, source_name="Token.sol"):
+    settings = {
+        "optimizer": {"enabled": optimize, "runs": runs},
+        "outputSelection": COMPILE_OUTPUT_SELECTION,
+    }
+    if via_ir:
+        settings["viaIR"] = True
+    return {"language": "Solidity", "sources": {source_name: {"content": source}}, "settings": settings}
+
+def compile_standard_json(standard_input, version):
+    # Результат кэшируется на диске по хэшу (версия, вход): повторная сборка тех же настроек бесплатна
+    key = hashlib.sha256((version.lstrip("v") + json.dumps(standard_input, sort_keys=True)).encode()).hexdigest()
+    cached = COMPILE_CACHE_DIR / f"{key}.json"
+    if cached.exists():
+        with open(cached) as f:
+            return json.load(f)
+
+    solc = solc_binary(version)
+    with span("compile", version=version):
+        process = subprocess.run([str(solc), "--standard-json"], input=json.dumps(standard_input),
+                                 capture_output=True, text=True, timeout=SOLC_TIMEOUT)
+    if process.returncode != 0 and not process.stdout:
+        raise CompilerError(process.stderr.strip() or f"solc exited with {process.returncode}")
+    output = json.loads(process.stdout)
+    errors = [e for e in output.get("errors", []) if e.get("severity") == "error"]
+    if errors:
+        raise CompilerError("; ".join(e.get("formattedMessage") or e["message"] for e in errors))
+
+    COMPILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(f"{key}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(output, f)
+    os.replace(tmp, cached)
+    return output
+
+def compiled_contract(output, contract_name, source_name=None):
+    for name, contracts in output.get("contracts", {}).items():
+        if source_name not in (None, name) or contract_name not in contracts:
+            continue
+        contract = contracts[contract_name]
+        refs = contract["evm"]["deployedBytecode"].get("immutableReferences", {})
+        return {
+            "sourceName": name,
+            "contractName": contract_name,
+            "abi": contract.get("abi", []),
+            "bytecode": contract["evm"]["bytecode"]["object"],
+            "deployedBytecode": contract["evm"]["deployedBytecode"]["object"],
+            "immutables": tuple(sorted((ref["start"], ref["length"]) for refs_list in refs.values()
+                                       for ref in refs_list)),
+        }
+    raise CompilerError(f"No contract {contract_name} in compiler output")
+
+def compile_contract(source, contract_name="Token", version="0.8.19", runs=200, via_ir=False):
+    output = compile_standard_json(single_file_input(source, runs, via_ir), version)
+    return compiled_contract(output, contract_name)
+
+def solc_long_version(path):
+    # solc-linux-amd64-v0.8.19+commit.7dd6d404 -> 0.8.19+commit.7dd6d404
+    return Path(path).name.split("-v", 1)[1].removesuffix(".exe")
+
+def with_optimizer_settings(standard_input, runs, via_ir):
+    settings = dict(standard_input.get("settings", {}), optimizer={"enabled": True, "runs": runs},
+                    outputSelection=COMPILE_OUTPUT_SELECTION)
+    settings.pop("viaIR", None)
+    if via_ir:
+        settings["viaIR"] = True
+    return dict(standard_input, settings=settings)
+
+def _compile_candidate(task):
+    # Выполняется в дочернем процессе: наружу идёт только хэш нормализованного runtime-кода
+    standard_input, version, runs, via_ir, contract_name, source_name = task
+    started = time.monotonic()
+    candidate = {"version": version, "runs": runs, "viaIR": via_ir}
+    try:
+        contract = compiled_contract(compile_standard_json(with_optimizer_settings(standard_input, runs, via_ir),
+                                                           version), contract_name, source_name)
+    except (CompilerError, subprocess.TimeoutExpired, ValueError) as e:
+        return dict(candidate, error=str(e).splitlines()[0] if str(e) else type(e).__name__)
+    code = bytes.fromhex(contract["deployedBytecode"])
+    return dict(candidate, sourceName=contract["sourceName"], immutables=contract["immutables"],
+                hash=hashlib.sha256(normalize_runtime_code(code, contract["immutables"])).hexdigest(),
+                seconds=round(time.monotonic() - started, 2))
+
+def search_compiler_settings(deployed_code, standard_input, contract_name="Token", source_name=None,
+                             versions=SEARCH_VERSIONS, runs=SEARCH_RUNS, via_ir=(True, False), workers=None):
+    # Сборка всей сетки (версия solc x runs x viaIR) в пуле процессов и сравнение с кодом по адресу
+    # без метаданных и immutables. Результаты приходят по мере готовности; index - место в сетке.
+    tasks = []
+    for version in versions:
+        try:
+            # Компиляторы скачиваются здесь, иначе воркеры качали бы одну и ту же версию параллельно
+            long_version = solc_long_version(solc_binary(version))
+        except (CompilerError, requests.RequestException) as e:
+            yield {"version": version, "error": str(e)}
+            continue
+        tasks += [(standard_input, long_version, r, ir, contract_name, source_name) for r in runs for ir in via_ir]
+
+    deployed = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_compile_candidate, task): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            candidate = dict(future.result(), index=futures[future])
+            if "hash" in candidate:
+                immutables = candidate.pop("immutables")
+                if immutables not in deployed:
+                    deployed[immutables] = hashlib.sha256(normalize_runtime_code(deployed_code, immutables)).hexdigest()
+                candidate["match"] = candidate.pop("hash") == deployed[immutables]
+            yield candidate
+
+def is_source_verified(address, client=None):
+    client = client or get_explorer_client()
+    with span("lookup_source", address=address) as phase:
+        verified = get_explorer_reader(client).is_verified(address)
+        phase.set(verified=verified)
+    return verified
+
+def iter_verify_grouped(deployments, rpc, concurrency=DEFAULT_CONCURRENCY, cache=None, checker=None, client=None,
+                        index=None):
+    # Токены фабрики отличаются только аргументами конструктора, а эксплорер сам сопоставляет
+    # одинаковый runtime-байткод с уже верифицированным. Из каждой группы отправляется один
+    # представитель, остальные после его успеха проверяются через getsourcecode и
+    # отправляются, только если не сопоставились.
+    client = client or get_explorer_client()
+    index = index or get_bytecode_index()
+    deployments = list(deployments)
+    with span("group_bytecode", deployments=len(deployments)) as phase, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        codes = list(executor.map(lambda d: bytes.fromhex(rpc.get_code(d["address"])[2:]), deployments))
+        groups = {}
+        for deployment, code in zip(deployments, codes):
+            # Без кода группировать нечего - такой адрес идёт отдельно и получит ошибку как обычно
+            key = index.group_key(code) if code else deployment["address"].lower()
+            groups.setdefault(key, []).append(deployment)
+        phase.set(groups=len(groups))
+
+    followers = {members[0]["address"].lower(): members[1:] for members in groups.values()}
+    leftovers = []
+    representatives = [members[0] for members in groups.values()]
+    for job in iter_verify_batch(representatives, concurrency, cache=cache, checker=checker, client=client):
+        members = followers.get(job["address"].lower(), [])
+        yield dict(job, groupSize=len(members) + 1)
+        if not members:
+            continue
+        if job["status"] not in (STATUS_VERIFIED, STATUS_ALREADY_VERIFIED):
+            leftovers.extend(members)
+            continue
+
+        def matched(deployment):
+            try:
+                return is_source_verified(deployment["address"], client)
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for deployment, ok in zip(members, executor.map(matched, members)):
+                if not ok:
+                    leftovers.append(deployment)
+                    continue
+                result = {"address": deployment["address"], "guid": None, "status": STATUS_ALREADY_VERIFIED,
+                          "result": "Matched by bytecode", "attempts": 0, "matchedBy": job["address"],
+                          "elapsed": None}
+                record_job(result)
+                yield result
+
+    if leftovers:
+        yield from iter_verify_batch(leftovers, concurrency, cache=cache, checker=checker, client=client)
+
+@functools.lru_cache(maxsize=None)
+def load_creation_codes(artifacts_dir=ARTIFACTS_DIR / "contracts"):
+    # Creation-байткод артефактов без CBOR-метаданных и типы их конструкторов
+    codes = []
+    for path in sorted(Path(artifacts_dir).rglob("*.json")):
+        if path.name.endswith(".dbg.json"):
+            continue
+        with open(path) as f:
+            artifact = json.load(f)
+        code = bytes.fromhex(artifact.get("bytecode", "0x")[2:])
+        if not code:
+            continue
+        constructor = next((item for item in artifact.get("abi", []) if item.get("type") == "constructor"), None)
+        codes.append({
+            "sourceName": artifact["sourceName"],
+            "contractName": artifact["contractName"],
+            "code": code,
+            "stripped": strip_metadata(code),
+            "types": tuple(i["type"] for i in constructor["inputs"]) if constructor else (),
+        })
+    return codes
+
+def split_creation_code(init_code):
+    # init code = creation-байткод артефакта + ABI-кодированные аргументы конструктора.
+    # Метаданные могут отличаться (другая сборка того же исходника), поэтому сравнивается код без них.
+    for artifact in load_creation_codes():
+        code = artifact["code"]
+        if init_code.startswith(code) or (
+                len(init_code) >= len(code) and init_code.startswith(artifact["stripped"])
+                and len(artifact["stripped"]) < len(code)):
+            return artifact, init_code[len(code):]
+    return None, None
+
+class CreationCache:
+    # Найденные creation-транзакции и хвосты аргументов: трассировка одного адреса не повторяется
+    def __init__(self, path=CREATIONS_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS creations (
+                address TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def get_many(self, addresses):
+        addresses = [a.lower() for a in addresses]
+        found = {}
+        with self._lock:
+            for i in range(0, len(addresses), 500):
+                part = addresses[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT address, record FROM creations WHERE address IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                found.update((address, json.loads(record)) for address, record in rows)
+        return found
+
+    def put_many(self, records):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO creations (address, record, updated_at) VALUES (?, ?, ?)",
+                [(record["address"].lower(), json.dumps(record), now) for record in records],
+            )
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+def _find_create_frame(frame, address):
+    if frame.get("type") in ("CREATE", "CREATE2") and (frame.get("to") or "").lower() == address:
+        return frame
+    for call in frame.get("calls", ()):
+        found = _find_create_frame(call, address)
+        if found:
+            return found
+    return None
+
+class ConstructorArgsRecovery:
+    # Аргументы конструктора из creation-транзакции: для прямого деплоя это хвост input транзакции,
+    # для токенов фабрики - хвост input кадра CREATE из debug_traceTransaction (callTracer).
+    # Транзакция берётся из строки (transactionHash, например из `index`) или getcontractcreation
+    # эксплорера; RPC-запросы идут JSON-RPC batch-ами в пуле из workers потоков.
+    def __init__(self, rpc, client=None, cache=None, workers=RECOVERY_WORKERS, batch_size=RECOVERY_BATCH,
+                 trace_batch=TRACE_BATCH):
+        self.rpc = rpc
+        self.client = client
+        self.cache = cache
+        self.workers = workers
+        self.batch_size = batch_size
+        self.trace_batch = trace_batch
+
+    def _batched(self, method, params, batch_size):
+        chunks = [params[i:i + batch_size] for i in range(0, len(params), batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(lambda chunk: self.rpc.batch([(method, p) for p in chunk]), chunks)
+            return [result for chunk in results for result in chunk]
+
+    def _creation_transactions(self, addresses):
+        if not self.client:
+            return {}
+        groups = [addresses[i:i + CREATION_LOOKUP_BATCH] for i in range(0, len(addresses), CREATION_LOOKUP_BATCH)]
+        with span("lookup_creation", addresses=len(addresses)), \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            found = {}
+            for items in executor.map(self.client.get_contract_creation, groups):
+                for item in items:
+                    found[item["contractAddress"].lower()] = item["txHash"]
+        return found
+
+    def recover(self, rows):
+        rows = [{"address": row} if isinstance(row, str) else row for row in rows]
+        cached = self.cache.get_many([row["address"] for row in rows]) if self.cache else {}
+        pending = {row["address"].lower(): row.get("transactionHash") for row in rows
+                   if row["address"].lower() not in cached}
+
+        missing = [address for address, tx_hash in pending.items() if not tx_hash]
+        pending.update(self._creation_transactions(missing))
+
+        records = {}
+        hashes = sorted({tx_hash for tx_hash in pending.values() if tx_hash})
+        with span("recover_args", addresses=len(pending), transactions=len(hashes)):
+            transactions = dict(zip(hashes, self._batched("eth_getTransactionByHash", [(h,) for h in hashes],
+                                                          self.batch_size)))
+            traced = sorted({h for h in hashes
+                             if not isinstance(transactions[h], RpcError) and transactions[h]
+                             and transactions[h].get("to")})
+            traces = dict(zip(traced, self._batched("debug_traceTransaction",
+                                                    [(h, {"tracer": "callTracer"}) for h in traced],
+                                                    self.trace_batch)))
+
+            for address, tx_hash in pending.items():
+                records[address] = self._record(address, tx_hash, transactions.get(tx_hash), traces.get(tx_hash))
+
+        if self.cache:
+            self.cache.put_many([record for record in records.values() if "error" not in record])
+        return [cached.get(row["address"].lower()) or records[row["address"].lower()] for row in rows]
+
+    def _record(self, address, tx_hash, transaction, trace):
+        record = {"address": address, "transactionHash": tx_hash}
+        if not tx_hash:
+            return dict(record, error="Creation transaction not found")
+        if isinstance(transaction, RpcError) or not transaction:
+            return dict(record, error=f"Transaction unavailable: {transaction}")
+        if not transaction.get("to"):
+            init_code, method = transaction["input"], "transaction"
+        else:
+            if isinstance(trace, RpcError) or not trace:
+                return dict(record, error=f"Trace unavailable: {trace}")
+            frame = _find_create_frame(trace, address)
+            if frame is None:
+                return dict(record, error="No CREATE of this address in the transaction")
+            init_code, method = frame["input"], "trace"
+
+        artifact, tail = split_creation_code(bytes.fromhex(init_code[2:]))
+        if artifact is None:
+            return dict(record, error="Init code does not start with any artifact's creation bytecode")
+        record.update(method=method, sourceName=artifact["sourceName"], contractName=artifact["contractName"],
+                      constructorArguments=tail.hex())
+        # Проверка: хвост должен разбираться типами конструктора и кодироваться обратно в те же байты
+        try:
+            values = get_abi_decoder(artifact["types"]).decode(tail)
+            record["decoded"] = list(values)
+            record["canonical"] = get_abi_encoder(artifact["types"]).encode(values) == tail.hex()
+        except ValueError as e:
+            record["decodeError"] = str(e)
+        return record
+
+    def iter_recover(self, rows, chunk=RECOVERY_CHUNK):
+        for batch in _chunks(rows, chunk):
+            yield from self.recover(batch)
+
+def _chunks(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def with_constructor_arguments(tokens, recovery, chunk=RECOVERY_CHUNK):
+    # Дополняет поток токенов найденными аргументами и именем контракта для standard-json
+    for batch in _chunks(tokens, chunk):
+        for token, record in zip(batch, recovery.recover(batch)):
+            if "error" in record:
+                yield dict(token, recoveryError=record["error"])
+            else:
+                yield dict(token, constructorArguments=record["constructorArguments"],
+                           sourceName=record["sourceName"], contractName=record["contractName"])
+
+def load_rows(path):
+    # JSON-список или JSONL (например вывод `index`), '-' - stdin
+    if path == "-":
+        text = sys.stdin.read().strip()
+    else:
+        with open(path) as f:
+            text = f.read().strip()
+    if text.startswith("["):
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [{"address": row} if isinstance(row, str) else row for row in rows]
+
+def load_deployments(path):
+    with open(path) as f:
+        deployments = json.load(f)
+    return [{"address": d} if isinstance(d, str) else d for d in deployments]
+
+def manifest_deployment(row):
+    # Строка манифеста: address, contract ("Token" или "contracts/Token.sol:Token"), args (JSON-список)
+    # и types либо готовый hex constructorArguments, explorer, codeFormat
+    row = {k: v for k, v in row.items() if v not in (None, "")}
+    if "address" not in row:
+        raise ValueError("missing address")
+    deployment = {"address": row["address"]}
+    contract = row.get("contract") or row.get("contractName")
+    if contract:
+        if ":" in contract:
+            deployment["sourceName"], deployment["contractName"] = contract.rsplit(":", 1)
+        else:
+            deployment["contractName"] = contract
+    args = row.get("args", row.get("constructorArgs"))
+    if isinstance(args, str):
+        args = json.loads(args)
+    if args is not None:
+        deployment["constructorArgs"] = args
+    types = row.get("types", row.get("constructorTypes"))
+    if types:
+        deployment["constructorTypes"] = tuple(types.split(",") if isinstance(types, str) else types)
+    for field in ("constructorArguments", "sourceName", "codeFormat", "explorer", "buildInfo", "compilerVersion", "runs"):
+        if field in row:
+            deployment[field] = row[field]
+    return deployment
+
+def read_manifest(path):
+    # Читает манифест построчно; битые строки не прерывают прогон, а приходят с полем error
+    f = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        if str(path).endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = f
+        for line, row in enumerate(rows, 2 if str(path).endswith(".csv") else 1):
+            try:
+                if isinstance(row, str):
+                    if not row.strip():
+                        continue
+                    row = json.loads(row)
+                deployment = manifest_deployment({"address": row} if isinstance(row, str) else row)
+            except (ValueError, TypeError, AttributeError) as e:
+                address = row.get("address") if isinstance(row, dict) else None
+                yield {"address": address, "line": line, "error": f"line {line}: {e}"}
+                continue
+            deployment["line"] = line
+            yield deployment
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def dry_run_deployment(deployment):
+    try:
+        params = build_verification_params(deployment)
+    except Exception as e:
+        return {"address": deployment["address"], "status": STATUS_ERROR, "result": str(e)}
+    return {
+        "address": deployment["address"],
+        "status": "dry_run",
+        "codeformat": params["codeformat"],
+        "contractname": params.get("contractname"),
+        "compilerversion": params["compilerversion"],
+        "constructorArguments": params.get("constructorArguments", ""),
+        "payloadBytes": len(params["sourceCode"]),
+    }
+
+def iter_verify_routed(deployments, client_for, default_explorer, concurrency=DEFAULT_CONCURRENCY, cache=None):
+    # Раскладывает поток деплоев по эксплорерам (поле explorer) в ограниченные очереди,
+    # у каждого эксплорера свой iter_verify_batch; в памяти не больше MANIFEST_LANE_SIZE
+    # ожидающих строк и max_pending задач на эксплорер
+    results = queue.Queue()
+    lanes = {}
+    done = object()
+
+    def lane(client, pending):
+        try:
+            for result in iter_verify_batch(iter(pending.get, None), concurrency, cache=cache, client=client):
+                results.put(dict(result, explorer=client.name))
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    def feed():
+        try:
+            for deployment in deployments:
+                name = deployment.pop("explorer", None) or default_explorer
+                if "error" in deployment:
+                    results.put({"address": deployment["address"], "line": deployment["line"], "explorer": name,
+                                 "guid": None, "status": STATUS_ERROR, "result": deployment["error"], "attempts": 0})
+                    continue
+                if name not in lanes:
+                    try:
+                        client = client_for(name)
+                    except KeyError:
+                        results.put({"address": deployment["address"], "line": deployment.get("line"),
+                                     "explorer": name, "guid": None, "status": STATUS_ERROR,
+                                     "result": f"Unknown explorer {name}", "attempts": 0})
+                        continue
+                    lanes[name] = queue.Queue(MANIFEST_LANE_SIZE)
+                    threading.Thread(target=lane, args=(client, lanes[name]), daemon=True).start()
+                lanes[name].put(deployment)
+        except Exception as e:
+            results.put(e)
+        finally:
+            for pending in lanes.values():
+                pending.put(None)
+            results.put(len(lanes))
+
+    threading.Thread(target=feed, daemon=True).start()
+    remaining = None
+    finished = 0
+    error = None
+    while remaining is None or finished < remaining:
+        item = results.get()
+        if item is done:
+            finished += 1
+        elif isinstance(item, int):
+            remaining = item
+        elif isinstance(item, Exception):
+            error = error or item
+        else:
+            yield item
+    if error:
+        raise error
+
+class VerificationJob:
+    # Одна отправка, которую ждут все запросы с тем же адресом и payload.
+    # События копятся в events, чтобы подключившийся позже получил всю историю.
+    def __init__(self, key, address, explorer):
+        self.key = key
+        self.id = key[:16]
+        self.address = address
+        self.explorer = explorer
+        self.events = []
+        self.done = False
+        self.waiters = 0
+        self.started = time.monotonic()
+        self._cond = threading.Condition()
+
+    def publish(self, status, result=None, done=False, **fields):
+        event = {"id": self.id, "address": self.address, "explorer": self.explorer,
+                 "status": status, "result": result, "time": time.time(), **fields}
+        with self._cond:
+            self.events.append(event)
+            self.done = self.done or done
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.events[-1], done=self.done, waiters=self.waiters)
+
+    def follow(self, timeout=DAEMON_STREAM_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self.events) and not self.done:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                events = self.events[seen:]
+                seen = len(self.events)
+                done = self.done
+            yield from events
+            if done:
+                return
+
+class VerificationService:
+    # Демон: клиенты эксплореров, кэш и артефакты живут между запросами, а одновременные
+    # запросы на один адрес с одинаковым payload сливаются в одну задачу (single-flight)
+    def __init__(self, clients, cache=None, concurrency=DEFAULT_CONCURRENCY, checker=None):
+        self.clients = {client.name: client for client in clients}
+        self.default_explorer = clients[0].name
+        self.cache = cache
+        self.checker = checker
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._jobs = {}
+        self._finished = {}
+        self._lock = threading.Lock()
+        self._pollers = {}
+        for client in clients:
+            poller = StatusPoller(
+                fetch=lambda guid, client=client: fetch_verification_status(guid, client),
+                on_poll=self._on_poll,
+                on_result=self._on_result,
+            )
+            threading.Thread(target=poller.run, daemon=True).start()
+            self._pollers[client.name] = poller
+
+    def request(self, deployment):
+        explorer = deployment.pop("explorer", None) or self.default_explorer
+        client = self.clients.get(explorer)
+        if client is None:
+            raise ValueError(f"Unknown explorer {explorer}, serving: {', '.join(self.clients)}")
+        params = build_verification_params(deployment)
+        key = VerificationCache.key(params, client.url)
+
+        with self._lock:
+            job = self._jobs.get(key)
+            created = job is None
+            if created:
+                job = VerificationJob(key, deployment["address"], explorer)
+                self._jobs[key] = job
+            job.waiters += 1
+        if created:
+            job.publish("queued")
+            self._executor.submit(self._submit, job, deployment, client)
+        return job, created
+
+    def get(self, job_id):
+        with self._lock:
+            for job in itertools.chain(self._jobs.values(), self._finished.values()):
+                if job.id == job_id:
+                    return job
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inFlight": len(self._jobs),
+                "finished": len(self._finished),
+                "explorers": {
+                    name: {"pending": self._pollers[name].pending(), "connections": client.connection_stats(),
+                           "keys": client.keys.stats(), "resilience": client.resilience_stats()}
+                    for name, client in self.clients.items()
+                },
+            }
+
+    def _submit(self, job, deployment, client):
+        try:
+            mismatch = self.checker.check(deployment) if self.checker else None
+            if mismatch:
+                self._finish(job, {"status": STATUS_FAILED, "result": mismatch, "attempts": 0, "guid": None})
+                return
+            result = submit_deployment(deployment, self.cache, client)
+        except Exception as e:
+            self._finish(job, {"status": STATUS_ERROR, "result": str(e), "attempts": 0, "guid": None})
+            return
+        if self.cache and not result.get("cached") and result["status"] != STATUS_THROTTLED:
+            self.cache.put(result["key"], result["address"], result["status"], guid=result["guid"],
+                           result=result["result"])
+        if result["status"] == STATUS_PENDING:
+            job.publish(STATUS_PENDING, guid=result["guid"], cached=bool(result.get("cached")))
+            self._pollers[client.name].add(result["guid"], job, result["submitted_at"])
+        else:
+            self._finish(job, result)
+
+    def _on_poll(self, poll, response):
+        poll["context"].publish(STATUS_PENDING, response.get("result"), guid=poll["guid"], attempts=poll["attempts"])
+
+    def _on_result(self, result):
+        job = result["context"]
+        if self.cache:
+            self.cache.put(job.key, job.address, result["status"], guid=result["guid"], result=result["result"])
+        self._finish(job, result)
+
+    def _finish(self, job, result):
+        fields = {k: result.get(k) for k in ("guid", "attempts", "cached") if result.get(k) is not None}
+        elapsed = time.monotonic() - job.started
+        job.publish(result["status"], result.get("result"), done=True, elapsed=elapsed, **fields)
+        record_job(dict(fields, address=job.address, status=result["status"], elapsed=elapsed))
+        with self._lock:
+            self._jobs.pop(job.key, None)
+            self._finished[job.key] = job
+            while len(self._finished) > DAEMON_KEEP_FINISHED:
+                self._finished.pop(next(iter(self._finished)))
+
+def serve(service, host=DAEMON_HOST, port=DAEMON_PORT):
+    # POST /verify - тело как строка манифеста; по умолчанию ответ - поток JSON-строк со статусами
+    # до финального, с ?wait=0 - только id задачи. GET /jobs/<id>[?stream=1], /health, /metrics.
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, code, body):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, job):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            try:
+                for event in job.follow():
+                    self.wfile.write((json.dumps(event) + "\n").encode())
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/verify":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                deployment = manifest_deployment(json.loads(self.rfile.read(length) or b"{}"))
+                job, created = service.request(deployment)
+            except Exception as e:
+                return self._send_json(400, {"error": str(e)})
+            if parse_qs(url.query).get("wait", ["1"])[0] == "0":
+                return self._send_json(202, dict(job.snapshot(), coalesced=not created))
+            self._stream(job)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                return self._send_json(200, service.stats())
+            if url.path == "/metrics":
+                body = _instrumentation.openmetrics().encode() if _instrumentation else b"# EOF\n"
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if url.path.startswith("/jobs/"):
+                job = service.get(url.path[len("/jobs/"):])
+                if job is None:
+                    return self._send_json(404, {"error": "unknown job"})
+                if parse_qs(url.query).get("stream", ["0"])[0] == "1":
+                    return self._stream(job)
+                return self._send_json(200, job.snapshot())
+            self._send_json(404, {"error": "not found"})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify Token contracts on the block explorer")
+    parser.add_argument("--cache", default=str(VERIFICATION_CACHE_PATH), help="verification cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always submit, ignoring cached results")
+    parser.add_argument("--explorers-config", default=str(EXPLORERS_CONFIG),
+                        help="JSON file adding or overriding explorers (url, chainId, apiKeyEnv)")
+    parser.add_argument("--explorer", help="explorer name, comma-separated names or 'all'; "
+                                           "defaults to the one matching REACT_APP_CHAIN_ID")
+    parser.add_argument("--log-json", help="write per-phase timing events as JSON lines to this file ('-' for stderr)")
+    parser.add_argument("--metrics-file", help="write OpenMetrics text with phase timings to this file on exit")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser("batch", help="verify a list of deployments concurrently")
+    batch.add_argument("deployments", help="JSON file with a list of addresses or deployment objects")
+    batch.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    batch.add_argument("--standard-json", action="store_true",
+                       help="submit solidity-standard-json-input built from artifacts/build-info")
+    batch.add_argument("--flattened", action="store_true",
+                       help="submit the source flattened from contracts/ with the Hardhat compiler settings")
+    batch.add_argument("--precheck", action="store_true",
+                       help="compare deployed bytecode with the artifacts before submitting (needs --rpc-url)")
+    batch.add_argument("--group", action="store_true",
+                       help="submit one deployment per runtime-bytecode group and look up the rest (needs --rpc-url)")
+    batch.add_argument("--rpc-url", help="defaults to the explorer's rpcUrl (REACT_APP_RPC_URL for its chain)")
+    batch.add_argument("--pool-size", type=int, default=EXPLORER_POOL_SIZE)
+    batch.add_argument("--timeout", type=float, default=EXPLORER_TIMEOUT[1], help="explorer read timeout, seconds")
+
+    verify = subparsers.add_parser("verify", help="verify deployments streamed from a JSONL or CSV manifest")
+    verify.add_argument("manifest", help="JSONL or .csv file ('-' for JSONL on stdin) with address, contract, "
+                                         "args/types or constructorArguments, explorer")
+    verify.add_argument("--output", help="append results as JSON lines to this file instead of stdout")
+    verify.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    verify.add_argument("--standard-json", action="store_true", help="default codeFormat for rows without one")
+    verify.add_argument("--flattened", action="store_true", help="default codeFormat for rows without one")
+    verify.add_argument("--dry-run", action="store_true", help="build and check payloads without submitting")
+    verify.add_argument("--resume", action="store_true",
+                        help="queue rows in the job store and skip jobs finished by an earlier run")
+    verify.add_argument("--jobs-db", default=str(JOB_STORE_PATH), help="job store database for --resume")
+    verify.add_argument("--pool-size", type=int, default=EXPLORER_POOL_SIZE)
+    verify.add_argument("--timeout", type=float, default=EXPLORER_TIMEOUT[1], help="explorer read timeout, seconds")
+
+    serve_cmd = subparsers.add_parser("serve", help="run a local HTTP daemon that verifies deployments on request")
+    serve_cmd.add_argument("--host", default=DAEMON_HOST)
+    serve_cmd.add_argument("--port", type=int, default=DAEMON_PORT)
+    serve_cmd.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    serve_cmd.add_argument("--precheck", action="store_true",
+                           help="compare deployed bytecode with the artifacts first (needs --rpc-url)")
+    serve_cmd.add_argument("--rpc-url", help="defaults to the explorer's rpcUrl")
+    serve_cmd.add_argument("--pool-size", type=int, default=EXPLORER_POOL_SIZE)
+    serve_cmd.add_argument("--timeout", type=float, default=EXPLORER_TIMEOUT[1], help="explorer read timeout, seconds")
+
+    encode = subparsers.add_parser("encode", help="ABI-encode Token constructor arguments")
+    encode.add_argument("args", help="scripts/args.js-style file, JSON list, or JSONL with one list per line")
+    encode.add_argument("--types", help="comma-separated ABI types, inferred from the argument count by default")
+
+    index = subparsers.add_parser("index", help="find tokens created by the factory since the last run")
+    index.add_argument("--rpc-url", default=env_setting("REACT_APP_RPC_URL"))
+    index.add_argument("--factory", default=env_setting("REACT_APP_FACTORY_ADDRESS"))
+    index.add_argument("--from-block", type=int, default=0, help="first block when there is no checkpoint yet")
+    index.add_argument("--confirmations", type=int, default=0)
+    index.add_argument("--checkpoint", default=str(INDEX_CHECKPOINT_PATH))
+    index.add_argument("--verify", action="store_true", help="verify discovered tokens right away")
+    index.add_argument("--precheck", action="store_true", help="compare deployed bytecode with the artifacts first")
+    index.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    index.add_argument("--recover-args", action="store_true",
+                       help="fill constructorArguments from the creation transactions (needs debug_traceTransaction)")
+
+    recover = subparsers.add_parser("recover", help="recover constructor arguments from creation transactions")
+    recover.add_argument("addresses", help="JSON list or JSONL of addresses or objects with transactionHash")
+    recover.add_argument("--rpc-url", help="defaults to the explorer's rpcUrl; needs debug_traceTransaction "
+                                           "for factory-created contracts")
+    recover.add_argument("--workers", type=int, default=RECOVERY_WORKERS)
+    recover.add_argument("--batch-size", type=int, default=RECOVERY_BATCH, help="JSON-RPC calls per batch request")
+    recover.add_argument("--creations-cache", default=str(CREATIONS_CACHE_PATH))
+
+    lookup = subparsers.add_parser("lookup", help="check whether addresses have verified source, "
+                                                  "answering from the local cache where possible")
+    lookup.add_argument("addresses", nargs="+", help="addresses or JSON/JSONL files with them")
+    lookup.add_argument("--abi", action="store_true", help="include the ABI")
+    lookup.add_argument("--refresh", action="store_true", help="ask the explorer even for cached addresses")
+    lookup.add_argument("--workers", type=int, default=SOURCE_LOOKUP_WORKERS)
+
+    search = subparsers.add_parser("search", help="compile a grid of compiler settings locally and find the ones "
+                                                  "that reproduce the deployed bytecode")
+    search.add_argument("address")
+    search.add_argument("--source", choices=("flattened", "build-info"), default="build-info",
+                        help="flattened Token source or the Hardhat build-info input")
+    search.add_argument("--contract", default="Token")
+    search.add_argument("--versions", default=",".join(SEARCH_VERSIONS))
+    search.add_argument("--runs", default=",".join(map(str, SEARCH_RUNS)))
+    search.add_argument("--via-ir", choices=("both", "on", "off"), default="both")
+    search.add_argument("--workers", type=int, help="compiler processes, defaults to the CPU count")
+    search.add_argument("--rpc-url", help="defaults to the explorer's rpcUrl")
+    search.add_argument("--submit", action="store_true", help="submit the first matching settings for verification")
+    search.add_argument("--constructor-arguments", help="hex; recovered from the creation transaction if omitted")
+
+    flatten = subparsers.add_parser("flatten", help="print a source file with all its imports inlined")
+    flatten.add_argument("source", nargs="?", default=DEFAULT_SOURCE_NAME)
+    flatten.add_argument("--output", help="write to a file instead of stdout")
+
+    jobs = subparsers.add_parser("jobs", help="durable verification queue shared by worker processes")
+    jobs.add_argument("--db", default=str(JOB_STORE_PATH), help="job store database")
+    jobs_actions = jobs.add_subparsers(dest="jobs_command", required=True)
+    jobs_add = jobs_actions.add_parser("add", help="queue deployments for the selected explorers")
+    jobs_add.add_argument("deployments", help="JSON file with a list of addresses or deployment objects")
+    jobs_add.add_argument("--standard-json", action="store_true")
+    jobs_add.add_argument("--flattened", action="store_true")
+    jobs_run = jobs_actions.add_parser("run", help="submit and poll queued jobs until none are left to lease")
+    jobs_run.add_argument("--worker-id", help="lease owner, defaults to host:pid")
+    jobs_run.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="lease duration, seconds")
+    jobs_run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    jobs_actions.add_parser("status", help="print job counts by explorer and state")
+
+    cache_cmd = subparsers.add_parser("cache", help="manage the local verification cache")
+    cache_actions = cache_cmd.add_subparsers(dest="cache_command", required=True)
+    invalidate = cache_actions.add_parser("invalidate", help="drop cached results")
+    invalidate.add_argument("--address", help="only drop entries for this address")
+    evict = cache_actions.add_parser("evict", help="drop expired failures and, optionally, old entries")
+    evict.add_argument("--older-than", type=float, help="also drop any entry older than this many days")
+
+    args = parser.parse_args()
+
+    log_stream = None
+    if args.log_json == "-":
+        log_stream = sys.stderr
+    elif args.log_json:
+        log_stream = open(args.log_json, "a")
+    if log_stream or args.metrics_file:
+        enable_instrumentation(log_stream)
+    try:
+        run_command(parser, args)
+    finally:
+        if args.metrics_file:
+            _instrumentation.write_openmetrics(args.metrics_file)
+        if log_stream not in (None, sys.stderr):
+            log_stream.close()
+
+def run_search(parser, args, explorer, client, cache):
+    rpc_url = args.rpc_url or explorer.get("rpcUrl")
+    if not rpc_url:
+        parser.error("search needs --rpc-url")
+    rpc = RpcClient(rpc_url)
+    code = bytes.fromhex(rpc.get_code(args.address)[2:])
+    if not code:
+        sys.exit(f"No contract code at {args.address}")
+
+    if args.source == "flattened":
+        standard_input, source_name = single_file_input(get_flattened_contract()), "Token.sol"
+    else:
+        source_name = DEFAULT_SOURCE_NAME
+        standard_input = load_build_info(find_build_info(source_name, args.contract))["input"]
+    via_ir = {"both": (True, False), "on": (True,), "off": (False,)}[args.via_ir]
+
+    started = time.monotonic()
+    matches = []
+    for candidate in search_compiler_settings(code, standard_input, args.contract, source_name,
+                                              args.versions.split(","), [int(r) for r in args.runs.split(",")],
+                                              via_ir, args.workers):
+        print(json.dumps(candidate), flush=True)
+        if candidate.get("match"):
+            matches.append(candidate)
+    print(f"{len(matches)} matching settings in {time.monotonic() - started:.1f}s", file=sys.stderr)
+    if not matches:
+        sys.exit(1)
+    if not args.submit:
+        return
+
+    best = min(matches, key=lambda candidate: candidate["index"])
+    constructor_arguments = args.constructor_arguments
+    if constructor_arguments is None:
+        record = ConstructorArgsRecovery(rpc, client).recover([args.address])[0]
+        if "error" in record:
+            sys.exit(f"Cannot recover constructor arguments: {record['error']}")
+        constructor_arguments = record["constructorArguments"]
+    deployment = {
+        "address": args.address,
+        "codeFormat": "standard-json",
+        "standardInput": json.dumps(with_optimizer_settings(standard_input, best["runs"], best["viaIR"]),
+                                    separators=(",", ":")),
+        "compilerVersion": "v" + best["version"],
+        "sourceName": best["sourceName"],
+        "contractName": args.contract,
+        "constructorArguments": constructor_arguments.removeprefix("0x"),
+    }
+    for job in iter_verify_batch([deployment], 1, cache=cache, client=client):
+        print(json.dumps(job), flush=True)
+
+def run_command(parser, args):
+    if args.command == "encode":
+        types = tuple(args.types.split(",")) if args.types else None
+        if args.args.endswith(".jsonl"):
+            with open(args.args) as f:
+                rows = (json.loads(line) for line in f if line.strip())
+                for encoded in encode_constructor_batch(rows, types):
+                    print(encoded)
+        else:
+            print(encode_constructor_arguments(load_js_args(args.args), types))
+        return
+
+    if args.command == "flatten":
+        source = get_flattener().flatten(args.source)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(source)
+        else:
+            print(source)
+        return
+
+    cache = None if args.no_cache else VerificationCache(args.cache)
+    try:
+        explorers = select_explorers(load_explorers(args.explorers_config), args.explorer)
+    except ValueError as e:
+        parser.error(str(e))
+    pool_size = getattr(args, "pool_size", EXPLORER_POOL_SIZE)
+    timeout = (EXPLORER_TIMEOUT[0], getattr(args, "timeout", EXPLORER_TIMEOUT[1]))
+    clients = [explorer_client_for(entry, pool_size=pool_size, timeout=timeout) for entry in explorers]
+    set_explorer_client(clients[0])
+
+    if args.command == "cache":
+        if cache is None:
+            parser.error("cache commands need the cache")
+        if args.cache_command == "invalidate":
+            removed = cache.invalidate(args.address)
+        else:
+            removed = cache.evict(args.older_than * 86400 if args.older_than is not None else None)
+        print(f"Removed {removed} cache entries")
+    elif args.command == "serve":
+        checker = None
+        if args.precheck:
+            rpc_url = args.rpc_url or explorers[0].get("rpcUrl")
+            if not rpc_url:
+                parser.error("--precheck needs --rpc-url")
+            checker = BytecodeChecker(RpcClient(rpc_url))
+        if _instrumentation is None:
+            enable_instrumentation()
+        server = serve(VerificationService(clients, cache, args.concurrency, checker), args.host, args.port)
+        print(f"Serving on http://{args.host}:{server.server_port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    elif args.command == "lookup":
+        addresses = []
+        for item in args.addresses:
+            addresses += [row["address"] for row in load_rows(item)] if os.path.exists(item) else [item]
+        reader = ExplorerReader(clients[0], SourceCache(), workers=args.workers)
+        try:
+            sources = reader.sources(addresses, args.refresh)
+        except ExplorerError as e:
+            sys.exit(str(e))
+        for address, source in sources.items():
+            row = {"address": address, "verified": source is not None}
+            if source:
+                row.update(contractName=source.get("ContractName"), compilerVersion=source.get("CompilerVersion"))
+                if args.abi:
+                    row["abi"] = json.loads(source["ABI"])
+            print(json.dumps(row))
+        print("Lookups:", json.dumps(reader.stats), file=sys.stderr)
+    elif args.command == "search":
+        run_search(parser, args, explorers[0], clients[0], cache)
+    elif args.command == "recover":
+        rpc_url = args.rpc_url or explorers[0].get("rpcUrl")
+        if not rpc_url:
+            parser.error("recover needs --rpc-url")
+        creations = None if args.no_cache else CreationCache(args.creations_cache)
+        recovery = ConstructorArgsRecovery(RpcClient(rpc_url), clients[0], creations, args.workers, args.batch_size)
+        for record in recovery.iter_recover(load_rows(args.addresses)):
+            print(json.dumps(record), flush=True)
+    elif args.command == "verify":
+        run_manifest(args, clients, pool_size, timeout, cache)
+    elif args.command == "jobs":
+        store = JobStore(args.db, getattr(args, "lease", JOB_LEASE_SECONDS))
+        try:
+            if args.jobs_command == "add":
+                added = 0
+                for deployment in load_deployments(args.deployments):
+                    if args.standard_json or args.flattened:
+                        deployment.setdefault("codeFormat", "standard-json" if args.standard_json else "flattened")
+                    for client in clients:
+                        added += store.add(deployment, client.name)
+                print(f"Queued {added} jobs")
+            elif args.jobs_command == "run":
+                def drain(client):
+                    for result in drain_job_store(store, client, args.worker_id, args.concurrency, cache=cache):
+                        print(json.dumps(dict(result, explorer=client.name)), flush=True)
+
+                with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+                    list(executor.map(drain, clients))
+            print(json.dumps(store.counts()))
+        finally:
+            store.close()
+    elif args.command == "index":
+        rpc = RpcClient(args.rpc_url)
+        indexer = TokenCreatedIndexer(rpc, args.factory, args.checkpoint, args.from_block, args.confirmations)
+        tokens = ({"codeFormat": "standard-json", **token} for token in indexer.scan())
+        if args.recover_args:
+            recovery = ConstructorArgsRecovery(rpc, clients[0], None if args.no_cache else CreationCache())
+            tokens = with_constructor_arguments(tokens, recovery)
+        if args.verify:
+            checker = BytecodeChecker(rpc) if args.precheck else None
+            for result in iter_verify_batch(tokens, args.concurrency, cache=cache, checker=checker):
+                print(json.dumps(result))
+        else:
+            for token in tokens:
+                print(json.dumps(token))
+    elif args.command == "batch":
+        deployments = load_deployments(args.deployments)
+        if args.standard_json or args.flattened:
+            for deployment in deployments:
+                deployment.setdefault("codeFormat", "standard-json" if args.standard_json else "flattened")
+        started = time.monotonic()
+        checkers = None
+        group_rpcs = None
+        if args.precheck or args.group:
+            checkers = {} if args.precheck else None
+            group_rpcs = {} if args.group else None
+            for entry in explorers:
+                rpc_url = args.rpc_url or entry.get("rpcUrl")
+                if not rpc_url:
+                    parser.error(f"--precheck and --group need --rpc-url or an rpcUrl for {entry['name']}")
+                rpc = RpcClient(rpc_url)
+                if args.precheck:
+                    checkers[entry["name"]] = BytecodeChecker(rpc)
+                if args.group:
+                    group_rpcs[entry["name"]] = rpc
+        reports = verify_on_explorers(deployments, clients, args.concurrency, cache=cache, checkers=checkers,
+                                      group_rpcs=group_rpcs)
+        for report in reports.values():
+            for result in report["results"]:
+                print(json.dumps(result))
+        for name, report in reports.items():
+            print(f"{name}: verified {report['verified']}/{report['total']} in {report['elapsed']:.1f}s, "
+                  f"connections {json.dumps(report['connections'])}, keys {json.dumps(report['keys'])}")
+        print(f"Total time {time.monotonic() - started:.1f}s")
+    else:
+        verify_contract(cache=cache)
+
+def run_manifest(args, clients, pool_size, timeout, cache):
+    explorers = load_explorers(args.explorers_config)
+    clients = {client.name: client for client in clients}
+    lock = threading.Lock()
+
+    def client_for(name):
+        with lock:
+            if name not in clients:
+                clients[name] = explorer_client_for(explorers[name], pool_size=pool_size, timeout=timeout)
+            return clients[name]
+
+    default_explorer = next(iter(clients))
+    code_format = "standard-json" if args.standard_json else "flattened" if args.flattened else None
+
+    def deployments():
+        for deployment in read_manifest(args.manifest):
+            if code_format:
+                deployment.setdefault("codeFormat", code_format)
+            yield deployment
+
+    if args.dry_run:
+        results = (
+            {"address": d["address"], "line": d["line"], "status": STATUS_ERROR, "result": d["error"]}
+            if "error" in d else dict(dry_run_deployment(d), line=d["line"],
+                                      explorer=d.get("explorer") or default_explorer)
+            for d in deployments()
+        )
+    elif args.resume:
+        results = resume_manifest(deployments(), client_for, default_explorer, args, cache)
+    else:
+        results = iter_verify_routed(deployments(), client_for, default_explorer, args.concurrency, cache)
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    counts = {}
+    try:
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Done: {json.dumps(counts)}", file=sys.stderr)
+
+def resume_manifest(deployments, client_for, default_explorer, args, cache):
+    # Строки сначала попадают в JobStore (повторно добавленные игнорируются), затем задачи
+    # каждого эксплорера разбираются drain_job_store - завершённые раньше уже не трогаются
+    store = JobStore(args.jobs_db)
+    names = set()
+    try:
+        for deployment in deployments:
+            name = deployment.pop("explorer", None) or default_explorer
+            error = deployment.get("error")
+            if not error:
+                try:
+                    client_for(name)
+                except KeyError:
+                    error = f"Unknown explorer {name}"
+            if error:
+                yield {"address": deployment["address"], "line": deployment.get("line"), "explorer": name,
+                       "status": STATUS_ERROR, "result": error}
+                continue
+            if not store.add(deployment, name):
+                # Завершённые в прошлых запусках задачи не отправляются, но попадают в отчёт
+                stored = store.get(JobStore.job_id(name, deployment["address"]))
+                if stored["state"] in JOB_FINAL_STATES:
+                    yield {"address": deployment["address"], "line": deployment.get("line"), "explorer": name,
+                           "guid": stored["guid"], "status": stored["status"], "result": stored["result"],
+                           "attempts": stored["attempts"], "stored": True}
+                    continue
+            names.add(name)
+
+        results = queue.Queue()
+
+        def drain(name):
+            try:
+                for result in drain_job_store(store, client_for(name), concurrency=args.concurrency, cache=cache):
+                    results.put(dict(result, explorer=name))
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(None)
+
+        for name in names:
+            threading.Thread(target=drain, args=(name,), daemon=True).start()
+        finished = 0
+        while finished < len(names):
+            item = results.get()
+            if item is None:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        store.close()
 
 if __name__ == "__main__":
-    verify_contract()
\ No newline at end of file
+    main()
@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from verifier_loader import load_verifier
+
+verifier = load_verifier()
+
+# keccak256("WhitelistUpdated(address,bool)")
+WHITELIST_UPDATED_TOPIC = "0xf93f9a76c1bf3444d22400a00cb9fe990e6abe9dbb333fda48859cfee864543d"
+# keccak256("TaxExclusionUpdated(address,bool)")
+TAX_EXCLUSION_UPDATED_TOPIC = "0x057dc60ecf6df48e0f4af40ef0f88074d41e0ce54a1fef20925cd23c6de03860"
+# whitelistAddresses(uint256)
+WHITELIST_ADDRESSES_SELECTOR = "0x5d1235d4"
+
+INDEX_DIR = verifier.CACHE_DIR / "whitelist-index"
+SNAPSHOT_INTERVAL = 50000
+SNAPSHOT_KEEP = 8
+SEED_BATCH = 50
+TOKENS_PER_QUERY = 200
+
+class WhitelistIndex:
+    # Состояние whitelist и isExcludedFromTax по токенам плюс обратные индексы адрес -> токены.
+    # События задают итоговое значение (account, status), поэтому повторное применение безопасно.
+    def __init__(self):
+        self.tokens = {}
+        self.whitelisted_by = {}
+        self.excluded_by = {}
+
+    def add_token(self, token, last_block, whitelist=(), excluded=()):
+        token = token.lower()
+        self.tokens[token] = {"lastBlock": last_block, "whitelist": set(), "excluded": set()}
+        for account in whitelist:
+            self.apply(token, WHITELIST_UPDATED_TOPIC, account, True)
+        for account in excluded:
+            self.apply(token, TAX_EXCLUSION_UPDATED_TOPIC, account, True)
+
+    def apply(self, token, topic, account, status):
+        account = account.lower()
+        if topic == WHITELIST_UPDATED_TOPIC:
+            members, reverse = self.tokens[token]["whitelist"], self.whitelisted_by
+        else:
+            members, reverse = self.tokens[token]["excluded"], self.excluded_by
+        if status:
+            members.add(account)
+            reverse.setdefault(account, set()).add(token)
+        else:
+            members.discard(account)
+            tokens = reverse.get(account)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del reverse[account]
+
+    def tokens_whitelisting(self, account):
+        return self.whitelisted_by.get(account.lower(), set())
+
+    def tokens_excluding(self, account):
+        return self.excluded_by.get(account.lower(), set())
+
+    def to_json(self):
+        return {
+            token: {"lastBlock": state["lastBlock"], "whitelist": sorted(state["whitelist"]),
+                    "excluded": sorted(state["excluded"])}
+            for token, state in self.tokens.items()
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        index = cls()
+        for token, state in data.items():
+            index.add_token(token, state["lastBlock"], state["whitelist"], state["excluded"])
+        return index
+
+class SnapshotStore:
+    # Снимки индекса snapshot-<block>.json с хэшем блока. При загрузке берётся самый новый снимок,
+    # чей блок всё ещё в канонической цепочке; снимки с отколовшейся ветки удаляются.
+    def __init__(self, path=INDEX_DIR, keep=SNAPSHOT_KEEP):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+
+    def _snapshots(self):
+        return sorted(self.path.glob("snapshot-*.json"))
+
+    def save(self, index, block, block_hash):
+        path = self.path / f"snapshot-{block:012d}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"block": block, "hash": block_hash, "tokens": index.to_json()}, f)
+        os.replace(tmp, path)
+        for old in self._snapshots()[:-self.keep]:
+            old.unlink()
+
+    def load(self, rpc=None):
+        for path in reversed(self._snapshots()):
+            with open(path) as f:
+                snapshot = json.load(f)
+            if rpc is not None and block_hash(rpc, snapshot["block"]) != snapshot["hash"]:
+                print(f"Block {snapshot['block']} was reorganized, dropping {path.name}", file=sys.stderr)
+                path.unlink()
+                continue
+            return WhitelistIndex.from_json(snapshot["tokens"]), snapshot["block"]
+        return WhitelistIndex(), None
+
+    def load_registry(self):
+        try:
+            with open(self.path / "tokens.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_registry(self, registry):
+        tmp = self.path / "tokens.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(registry, f, indent=2)
+        os.replace(tmp, self.path / "tokens.json")
+
+def block_hash(rpc, number):
+    block = rpc.call("eth_getBlockByNumber", hex(number), False)
+    return block["hash"] if block else None
+
+def creation_block(rpc, token, head):
+    # Первый блок, где по адресу есть код: бинарный поиск по eth_getCode (нужна архивная нода)
+    if len(rpc.get_code(token, hex(head))) <= 2:
+        raise ValueError(f"No contract code at {token} at block {head}")
+    low, high = 0, head
+    while low < high:
+        middle = (low + high) // 2
+        if len(rpc.get_code(token, hex(middle))) > 2:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+def read_whitelist_addresses(rpc, token, block, batch_size=SEED_BATCH):
+    # whitelistAddresses(i) пачками JSON-RPC batch, пока вызов не откатится за концом массива
+    decoder = verifier.get_abi_decoder(("address",))
+    addresses = []
+    while True:
+        calls = [
+            ("eth_call", ({"to": token, "data": WHITELIST_ADDRESSES_SELECTOR + i.to_bytes(32, "big").hex()},
+                          hex(block)))
+            for i in range(len(addresses), len(addresses) + batch_size)
+        ]
+        for result in rpc.batch(calls):
+            if isinstance(result, verifier.RpcError):
+                if "revert" not in result.message.lower():
+                    raise result
+                return addresses
+            if result in (None, "0x"):
+                return addresses
+            addresses.append(decoder.decode(result)[0])
+
+def update(rpc, store, registry, confirmations=0, tokens_per_query=TOKENS_PER_QUERY):
+    index, snapshot_block = store.load(rpc)
+    head = rpc.block_number() - confirmations
+
+    # Новые токены (и выпавшие при откате) засеваются массивом whitelistAddresses на блоке создания.
+    # Исключения из налога перечислить нельзя, они восстанавливаются только из событий, поэтому
+    # засев позже создания потерял бы их. События самого блока засева применяются ещё раз: итог тот же.
+    for token, seed_block in registry.items():
+        if token not in index.tokens:
+            seed_block = min(head, seed_block)
+            index.add_token(token, seed_block - 1, read_whitelist_addresses(rpc, token, seed_block))
+
+    groups = {}
+    for token, state in index.tokens.items():
+        groups.setdefault(state["lastBlock"] + 1, []).append(token)
+
+    decoder = verifier.get_abi_decoder(("address", "bool"))
+    applied = 0
+    last_snapshot = snapshot_block or 0
+    for start, tokens in sorted(groups.items()):
+        for i in range(0, len(tokens), tokens_per_query):
+            part = tokens[i:i + tokens_per_query]
+            topics = [[WHITELIST_UPDATED_TOPIC, TAX_EXCLUSION_UPDATED_TOPIC]]
+            for logs, to_block, _ in verifier.iter_log_chunks(rpc, part, topics, start, head):
+                logs = sorted((log for log in logs if not log.get("removed")),
+                              key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+                for log in logs:
+                    account, status = decoder.decode(log["data"])
+                    index.apply(log["address"].lower(), log["topics"][0], account, status)
+                applied += len(logs)
+                for token in part:
+                    index.tokens[token]["lastBlock"] = to_block
+                if to_block - last_snapshot >= SNAPSHOT_INTERVAL and \
+                        len({state["lastBlock"] for state in index.tokens.values()}) == 1:
+                    store.save(index, to_block, block_hash(rpc, to_block))
+                    last_snapshot = to_block
+
+    for state in index.tokens.values():
+        state["lastBlock"] = max(state["lastBlock"], head)
+    store.save(index, head, block_hash(rpc, head))
+    return index, applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Whitelist and tax-exclusion index rebuilt from Token events")
+    parser.add_argument("--dir", default=str(INDEX_DIR), help="snapshot directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_cmd = subparsers.add_parser("update", help="apply new blocks, registering tokens first if given")
+    update_cmd.add_argument("tokens", nargs="?", help="JSON list or JSONL of tokens, e.g. `verify-contract.py index` "
+                                                      "output; blockNumber is the seed block, "
+                                                      "otherwise the creation block is looked up")
+    update_cmd.add_argument("--rpc-url", default=verifier.env_setting("REACT_APP_RPC_URL"))
+    update_cmd.add_argument("--confirmations", type=int, default=0)
+    update_cmd.add_argument("--tokens-per-query", type=int, default=TOKENS_PER_QUERY)
+
+    query = subparsers.add_parser("query", help="tokens that whitelist or exclude an address from tax")
+    query.add_argument("address")
+
+    show = subparsers.add_parser("show", help="whitelist and tax exclusions of one token")
+    show.add_argument("token")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.dir)
+    if args.command == "update":
+        if not args.rpc_url:
+            parser.error("--rpc-url is required")
+        registry = store.load_registry()
+        rpc = verifier.RpcClient(args.rpc_url)
+        for token in verifier.load_rows(args.tokens) if args.tokens else []:
+            registry.setdefault(token["address"].lower(), token.get("blockNumber"))
+        unknown = [address for address, block in registry.items() if block is None]
+        head = rpc.block_number() if unknown else None
+        for address in unknown:
+            try:
+                registry[address] = creation_block(rpc, address, head)
+            except (ValueError, verifier.RpcError) as e:
+                store.save_registry({a: b for a, b in registry.items() if b is not None})
+                sys.exit(f"Cannot find the creation block of {address} ({e}); pass it as blockNumber")
+        store.save_registry(registry)
+        started = time.monotonic()
+        index, applied = update(rpc, store, registry, args.confirmations,
+                                args.tokens_per_query)
+        print(f"Applied {applied} events to {len(index.tokens)} tokens in {time.monotonic() - started:.1f}s")
+        return
+
+    index, block = store.load()
+    if args.command == "query":
+        print(json.dumps({
+            "block": block,
+            "whitelistedBy": sorted(index.tokens_whitelisting(args.address)),
+            "excludedFromTaxBy": sorted(index.tokens_excluding(args.address)),
+        }, indent=2))
+    else:
+        state = index.tokens.get(args.token.lower())
+        if state is None:
+            sys.exit(f"Token {args.token} is not indexed")
+        print(json.dumps({"block": block, "whitelist": sorted(state["whitelist"]),
+                          "excluded": sorted(state["excluded"])}, indent=2))
+
+if __name__ == "__main__":
+    main()